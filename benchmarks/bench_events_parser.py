@@ -0,0 +1,95 @@
+"""
+Benchmark the Game/Events parser: pandas.read_html (the old getGameStats
+path) against the lxml based parse_game_events.
+
+Events pages are read from saved HTML files/directories and/or from the
+page cache written by get_all_stats.py. Both parsers must return the same
+rows, otherwise the benchmark fails.
+
+Usage:
+    python3 benchmarks/bench_events_parser.py --cache .swehockey_cache.sqlite
+    python3 benchmarks/bench_events_parser.py saved_pages/Events/ --repeat 5
+"""
+import argparse
+import io
+import os
+import sqlite3
+import sys
+import time
+import zlib
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from get_all_stats import parse_game_events
+
+
+def load_pages(paths, cache_file):
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.html'))
+        else:
+            files = [path]
+        for filename in files:
+            with open(filename, 'rb') as f:
+                pages.append(f.read())
+    if cache_file:
+        conn = sqlite3.connect(cache_file)
+        for (body,) in conn.execute("SELECT body FROM pages WHERE url LIKE '%/Game/Events/%' ORDER BY url"):
+            pages.append(zlib.decompress(body))
+        conn.close()
+    return pages
+
+
+def parse_with_pandas(content):
+    """The parsing done by getGameStats before parse_game_events"""
+    df_gamedata = pd.read_html(io.BytesIO(content), match='Actions', attrs={'class': 'tblContent'}, displayed_only=False)
+    df_gameevents = df_gamedata[1].iloc[:, [0, 1, 2, 3, 4]]
+    df_gameevents.columns = ['time', 'event', 'team', 'players', 'on_ice']
+    df_gameevents = df_gameevents[df_gameevents['time'].str.len() == 5]
+    rows = []
+    for _, row in df_gameevents.iloc[::-1].iterrows():
+        rows.append(tuple('' if pd.isna(row[col]) else row[col] for col in ['time', 'event', 'team', 'players']))
+    return rows
+
+
+def run(parser, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in pages:
+            parser(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Game/Events page parsing")
+    parser.add_argument("paths", nargs="*", help="Saved Events HTML files or directories")
+    parser.add_argument("--cache", metavar="FILE", help="Read Events pages from a get_all_stats.py page cache")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser, the best one is reported (default: 3)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths, args.cache)
+    if not pages:
+        parser.error("no Events pages found")
+    total_bytes = sum(len(content) for content in pages)
+    print(f"{len(pages)} Events pages, {total_bytes / 1024:.0f} KiB")
+
+    for content in pages:
+        if parse_with_pandas(content) != [tuple(event) for event in parse_game_events(content)]:
+            sys.exit("Parsers disagree on a page, not benchmarking")
+
+    results = [
+        ("pandas.read_html", run(parse_with_pandas, pages, args.repeat)),
+        ("parse_game_events", run(parse_game_events, pages, args.repeat)),
+    ]
+    for name, elapsed in results:
+        print(f"{name:<18} {elapsed:8.3f} s  {len(pages) / elapsed:8.1f} pages/s")
+    print(f"Speedup: {results[0][1] / results[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
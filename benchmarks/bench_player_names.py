@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for tokenizing the players strings of Events pages
+("18. Andersson, Henry"): the regexes parse_goal/parse_penalty used before
+against the shared tokenize_players.
+
+Players strings of goal and penalty rows are taken from saved Events pages
+(HTML files/directories or the page cache) and/or from get_all_stats.py
+console logs, which print every row as
+"Processing '<event>' <team> <time>: <players>".
+
+Usage:
+    python3 benchmarks/bench_player_names.py --log shl.out xx.out dm.out
+    python3 benchmarks/bench_player_names.py --cache .swehockey_cache.sqlite
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from get_all_stats import PENALTY_RE, SCORE_RE, parse_game_events, tokenize_players
+from bench_events_parser import load_pages
+
+OLD_GOAL_PATTERN = r"(\d{1,2})\.\s+([A-Za-zåäöÅÄÖ-]+),\s+([A-Za-zåäöÅÄÖ-]+)"
+OLD_PENALTY_PATTERN = r"(\d+)\.\s+([A-Za-zÅÄÖåäöÉéèÁáÀàÁáøØüæ'`-]+(?:\s+[A-Za-zÅÄÖåäöÉéèÁáÀàÁáøØüæ'`-]+)*),\s+([A-Za-zÅÄÖåäöÉéèÁáÀàÁáøØü'`-]+)"
+LOG_LINE_RE = re.compile(r"^Processing '([^']*)' \S+ \d\d:\d\d: (.+)$")
+
+
+def is_player_event(event):
+    """Goals and penalties are the rows whose players string gets tokenized"""
+    return bool(SCORE_RE.match(event) or PENALTY_RE.match(event))
+
+
+def load_strings(args):
+    strings = []
+    for filename in args.log:
+        with open(filename, encoding='utf-8') as f:
+            for line in f:
+                match = LOG_LINE_RE.match(line.rstrip('\n'))
+                if match and is_player_event(match.group(1)):
+                    strings.append(match.group(2))
+    for content in load_pages(args.paths, args.cache):
+        strings.extend(event.players for event in parse_game_events(content) if is_player_event(event.event))
+    return strings
+
+
+def tokenize_old(player_string):
+    return re.findall(OLD_GOAL_PATTERN, player_string) or re.findall(OLD_PENALTY_PATTERN, player_string)
+
+
+def run(tokenizer, strings, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for player_string in strings:
+            tokenizer(player_string)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tokenizing Events players strings")
+    parser.add_argument("paths", nargs="*", help="Saved Events HTML files or directories")
+    parser.add_argument("--cache", metavar="FILE", help="Read Events pages from a get_all_stats.py page cache")
+    parser.add_argument("--log", nargs="*", default=[], metavar="FILE", help="get_all_stats.py console logs")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per tokenizer, the best one is reported (default: 5)")
+    args = parser.parse_args()
+
+    strings = load_strings(args)
+    if not strings:
+        parser.error("no players strings found")
+    print(f"{len(strings)} players strings")
+
+    for name, tokenizer in (("old regexes", tokenize_old), ("tokenize_players", tokenize_players)):
+        players = sum(len(tokenizer(player_string)) for player_string in strings)
+        unparsed = sum(1 for player_string in strings
+                       if not tokenizer(player_string) and not player_string.startswith("Team"))
+        elapsed = run(tokenizer, strings, args.repeat)
+        print(f"{name:<17} {elapsed:7.3f} s  {len(strings) / elapsed:10.0f} strings/s  "
+              f"{players} players found, {unparsed} strings unparsed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Replay captured stats.swehockey.se pages through get_all_stats.py offline.
+
+Pages are served from a fixture directory laid out as
+    <fixtures>/Schedule/<schedule_id>.html
+    <fixtures>/LineUps/<game_id>.html
+    <fixtures>/Events/<game_id>.html
+by replacing the HTTP session of get_all_stats, so getAllScheduledGames
+runs end to end without network or page cache. The run reports wall time,
+time per stage and peak memory, and the CSV files can be checked against
+golden files so performance work can be shown not to change the output.
+
+Capture fixtures from the page cache of earlier runs (or from a console
+dump such as xx, which holds the raw Schedule page):
+    python3 benchmarks/replay.py fixtures --record --cache .swehockey_cache.sqlite
+    python3 benchmarks/replay.py fixtures --record --import-dump xx
+
+Replay:
+    python3 benchmarks/replay.py fixtures 19563 --golden golden/ --update-golden
+    python3 benchmarks/replay.py fixtures 19563 --golden golden/
+"""
+import argparse
+import filecmp
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import get_all_stats
+
+PAGE_URL_RE = re.compile(r"/(Schedule|LineUps|Events)/(\d+)")
+OUTPUT_FILES = ["player_stats.csv", "player_events.csv"]
+SCRAPE_STAGES = ("fetch", "schedule parse", "lineup parse", "events parse", "merge")
+
+
+class FixtureResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+class FixtureSession:
+    """
+    Stands in for the requests session of get_all_stats and answers every
+    GET from the fixture directory (404 for pages that were not captured).
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        match = PAGE_URL_RE.search(url)
+        if match:
+            filename = os.path.join(self.directory, match.group(1), match.group(2) + ".html")
+            if os.path.exists(filename):
+                with open(filename, 'rb') as f:
+                    return FixtureResponse(200, f.read())
+        return FixtureResponse(404, b"")
+
+
+def save_fixture(directory, url, content):
+    match = PAGE_URL_RE.search(url)
+    if not match:
+        return False
+    os.makedirs(os.path.join(directory, match.group(1)), exist_ok=True)
+    with open(os.path.join(directory, match.group(1), match.group(2) + ".html"), 'wb') as f:
+        f.write(content)
+    return True
+
+
+def record(directory, cache_file, dumps):
+    """
+    Copy pages from a page cache and from console dumps into the fixture directory
+    """
+    saved = 0
+    if cache_file:
+        conn = sqlite3.connect(cache_file)
+        for url, body in conn.execute("SELECT url, body FROM pages"):
+            saved += save_fixture(directory, url, zlib.decompress(body))
+        conn.close()
+    for dump in dumps:
+        # A page in a dump is printed as the line naming its URL followed by the HTML document
+        with open(dump, encoding='utf-8') as f:
+            text = f.read()
+        for match in re.finditer(r"(https?://\S+)\n(<!DOCTYPE html>.*?</html>)", text, re.S):
+            saved += save_fixture(directory, match.group(1), match.group(2).encode('utf-8'))
+    print(f"{saved} pages written to {directory}")
+
+
+class StageTimer:
+    """
+    Wraps functions of get_all_stats and accumulates the time spent in them per stage
+    """
+    def __init__(self):
+        self.times = {}
+
+    def wrap(self, stage, name):
+        func = getattr(get_all_stats, name)
+        self.times.setdefault(stage, 0.0)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.times[stage] += time.perf_counter() - start
+
+        setattr(get_all_stats, name, timed)
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def replay(args):
+    session = FixtureSession(args.fixtures)
+    get_all_stats.session = session
+    get_all_stats.page_cache = None
+    get_all_stats.crawler = get_all_stats.Crawler(rate=0, max_concurrency=args.concurrency)
+    # Schedule parsing and merging are timed by the scraper itself
+    get_all_stats.metrics = get_all_stats.Metrics()
+
+    schedule_ids = args.schedule_ids or sorted(
+        name[:-5] for name in os.listdir(os.path.join(args.fixtures, "Schedule")) if name.endswith(".html")
+    )
+    out_dir = args.out or tempfile.mkdtemp(prefix="replay-")
+    os.makedirs(out_dir, exist_ok=True)
+
+    timer = StageTimer()
+    timer.wrap("fetch", "fetch_page")
+    timer.wrap("lineup parse", "parse_lineup")
+    timer.wrap("events parse", "parse_game_events")
+
+    get_all_stats.setup_logging(args.log_level)
+    if args.parse_workers > 1:
+        get_all_stats.parse_pool = get_all_stats.create_parse_pool(args.parse_workers)
+    start = time.perf_counter()
+    for schedule_id in schedule_ids:
+        get_all_stats.getAllScheduledGames(schedule_id, args.concurrency, parse_workers=args.parse_workers)
+    scrape_time = time.perf_counter() - start
+
+    write_start = time.perf_counter()
+    get_all_stats.write_player_stats_csv(get_all_stats.player_stats, os.path.join(out_dir, OUTPUT_FILES[0]))
+    get_all_stats.write_events_csv(get_all_stats.player_stats, os.path.join(out_dir, OUTPUT_FILES[1]))
+    timer.times["CSV write"] = time.perf_counter() - write_start
+    wall_time = time.perf_counter() - start
+
+    for stage, name in (("schedule parse", "parse.schedule"), ("merge", "merge")):
+        timer.times[stage] = get_all_stats.metrics.timings.get(name, {}).get("seconds", 0.0)
+    # The rest of getAllScheduledGames, mostly importing pandas and BeautifulSoup for the first schedule
+    timer.times["other"] = scrape_time - sum(timer.times[stage] for stage in SCRAPE_STAGES)
+
+    print(f"Schedules:  {', '.join(schedule_ids)}")
+    print(f"Games:      {len(get_all_stats.processed_games)}  ({session.requests} pages served)")
+    print(f"Events:     {len(get_all_stats.event_store)}")
+    print(f"Wall time:  {wall_time:.3f} s")
+    for stage in SCRAPE_STAGES + ("other", "CSV write"):
+        print(f"  {stage:<14} {timer.times[stage]:8.3f} s")
+    peak = peak_memory_mb()
+    if peak is not None:
+        print(f"Peak memory: {peak:.1f} MiB")
+    if args.concurrency > 1:
+        print("Note: with --concurrency > 1 stage times are summed over threads")
+    if args.parse_workers > 1:
+        print("Note: with --parse-workers > 1 parsing runs in worker processes and is not timed")
+
+    if args.golden:
+        return check_golden(out_dir, args.golden, args.update_golden)
+    print(f"Output written to {out_dir}")
+    return 0
+
+
+def check_golden(out_dir, golden_dir, update):
+    if update:
+        os.makedirs(golden_dir, exist_ok=True)
+        for name in OUTPUT_FILES:
+            shutil.copyfile(os.path.join(out_dir, name), os.path.join(golden_dir, name))
+        print(f"Golden files updated in {golden_dir}")
+        return 0
+
+    failed = 0
+    for name in OUTPUT_FILES:
+        golden = os.path.join(golden_dir, name)
+        if os.path.exists(golden) and filecmp.cmp(os.path.join(out_dir, name), golden, shallow=False):
+            print(f"OK        {name}")
+        else:
+            print(f"MISMATCH  {name} (output kept in {out_dir})")
+            failed += 1
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured pages through get_all_stats.py offline")
+    parser.add_argument("fixtures", help="Fixture directory with Schedule/, LineUps/ and Events/ pages")
+    parser.add_argument("schedule_ids", nargs="*", help="Schedule IDs to replay (default: every captured schedule)")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N", help="Passed on to getAllScheduledGames")
+    parser.add_argument("--parse-workers", type=int, default=1, metavar="N", help="Passed on to getAllScheduledGames")
+    parser.add_argument("--out", metavar="DIR", help="Where to write the CSV files (default: a temporary directory)")
+    parser.add_argument("--golden", metavar="DIR", help="Compare the CSV files with the ones in DIR")
+    parser.add_argument("--update-golden", action="store_true", help="Replace the golden files with this run's output")
+    parser.add_argument("--log-level", default="ERROR", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="Log level of the scraper while replaying (default: ERROR)")
+    parser.add_argument("--record", action="store_true", help="Capture fixtures instead of replaying")
+    parser.add_argument("--cache", metavar="FILE", help="With --record: page cache to copy pages from")
+    parser.add_argument("--import-dump", nargs="*", default=[], metavar="FILE",
+                        help="With --record: console dumps (like xx) to extract pages from")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.fixtures, args.cache, args.import_dump)
+        return 0
+    return replay(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,409 @@
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
 import re
 import csv
-import sys
+import io
+import unicodedata
+import argparse
+import sqlite3
+import threading
+import time
+import zlib
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import heapq
+import bisect
+import random
+import contextlib
+import atexit
+import logging
+import logging.handlers
+import queue
+import multiprocessing
+from array import array
+from collections import deque, namedtuple
+from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+
+log = logging.getLogger("swehockey")
+# Handlers the log records end up in, set up by setup_logging
+log_handlers = []
+
+class ConsoleFormatter(logging.Formatter):
+    """Plain messages, with a "WARNING: "/"ERROR: " prefix for problems"""
+    def format(self, record):
+        message = super().format(record)
+        return message if record.levelno < logging.WARNING else f"{record.levelname}: {message}"
+
+def setup_logging(level="INFO", log_file=None):
+    """
+    Send log records through a queue to a background thread, which writes them
+    to stderr and, if given, to log_file. Records below level are dropped before
+    their message is formatted, and the scraping code never waits for terminal
+    or disk I/O. With a log file the console only shows INFO and above.
+    """
+    global log_handlers
+    level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    console = logging.StreamHandler()
+    console.setFormatter(ConsoleFormatter("%(message)s"))
+    console.setLevel(max(level, logging.INFO) if log_file else level)
+    handlers = [console]
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(threadName)s %(message)s"))
+        handlers.append(file_handler)
+
+    log_handlers = handlers
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    log.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    log.setLevel(level)
+    log.propagate = False
+
+class Progress:
+    """
+    Logs how many of total games are done, the rate and the estimated time
+    left, at most once every interval seconds and when the last game is done.
+    """
+    def __init__(self, label, total, interval=5.0):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.start = self.last = time.monotonic()
+
+    def update(self, count=1):
+        self.done += count
+        now = time.monotonic()
+        if now - self.last < self.interval and self.done < self.total:
+            return
+        self.last = now
+        rate = self.done / max(now - self.start, 1e-9)
+        eta = (self.total - self.done) / rate
+        log.info("%s: %d/%d games (%.1f games/s, ETA %.0fs)", self.label, self.done, self.total, rate, eta)
+
+# Upper bounds in seconds of the buckets of the latency histograms in Metrics
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30)
+PAGE_TYPE_RE = re.compile(r"/(Schedule|LineUps|Events)/")
+
+def page_type(url):
+    """'Schedule', 'LineUps' or 'Events' for a stats.swehockey.se URL"""
+    match = PAGE_TYPE_RE.search(url)
+    return match.group(1) if match else "other"
+
+class Metrics:
+    """
+    Instrumentation of a run: number of calls, total time and a latency
+    histogram per stage ('fetch.Events', 'parse.lineup', 'merge', ...) and
+    counters such as bytes downloaded and page cache hits and misses per
+    page type. Thread safe, as pages are fetched in a thread pool.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def observe(self, stage, seconds):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self.lock:
+            timing = self.timings.get(stage)
+            if timing is None:
+                timing = self.timings[stage] = {"count": 0, "seconds": 0.0, "max": 0.0,
+                                                "histogram": [0] * (len(LATENCY_BUCKETS) + 1)}
+            timing["count"] += 1
+            timing["seconds"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            timing["histogram"][bucket] += 1
+
+    @contextlib.contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @staticmethod
+    def percentile(histogram, fraction):
+        """Upper bound of the histogram bucket holding the given fraction of the observations"""
+        target = fraction * sum(histogram)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), histogram):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return 0.0
+
+    def summary(self):
+        """The metrics of the run as a JSON serializable dict"""
+        with self.lock:
+            timings = {stage: dict(timing, histogram=list(timing["histogram"])) for stage, timing in self.timings.items()}
+            counters = dict(self.counters)
+        stages = {}
+        for stage, timing in sorted(timings.items()):
+            p95 = self.percentile(timing["histogram"], 0.95)
+            stages[stage] = {
+                "count": timing["count"],
+                "seconds": round(timing["seconds"], 4),
+                "mean_ms": round(1000 * timing["seconds"] / timing["count"], 3),
+                "p50_ms": 1000 * self.percentile(timing["histogram"], 0.5),
+                "p95_ms": None if p95 == float("inf") else 1000 * p95,
+                "max_ms": round(1000 * timing["max"], 3),
+                "histogram": {("+Inf" if bound is None else f"{bound * 1000:g}ms"): count
+                              for bound, count in zip(LATENCY_BUCKETS + (None,), timing["histogram"]) if count},
+            }
+        cache_hit_rate = {}
+        for name in counters:
+            if name.startswith("cache_hit.") or name.startswith("cache_miss."):
+                kind = name.split(".", 1)[1]
+                hits, misses = counters.get(f"cache_hit.{kind}", 0), counters.get(f"cache_miss.{kind}", 0)
+                cache_hit_rate[kind] = round(hits / (hits + misses), 4)
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": round(time.time() - self.started, 3),
+            "bytes_downloaded": sum(value for name, value in counters.items() if name.startswith("bytes.")),
+            "cache_hit_rate": cache_hit_rate,
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def write(self, filename, extra=None, history=100):
+        """
+        Append the summary of this run (with the items of extra) to the runs
+        kept in the JSON file filename, keeping the last history runs, so
+        trends over nightly runs can be followed
+        """
+        run = self.summary()
+        run.update(extra or {})
+        runs = []
+        if os.path.exists(filename):
+            try:
+                with open(filename, encoding='utf-8') as f:
+                    runs = json.load(f).get("runs", [])
+            except (ValueError, AttributeError):
+                log.warning("Could not read earlier runs from %s, starting a new history", filename)
+        if runs:
+            log.info("Run took %.1fs, the previous one %.1fs", run["wall_seconds"], runs[-1].get("wall_seconds", 0))
+        runs = (runs + [run])[-history:]
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, mode='w', encoding='utf-8') as f:
+            json.dump({"runs": runs}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_filename, filename)
+        log.info("Metrics written to %s", filename)
+
+# Metrics of the run, recorded by fetching, parsing and merging
+metrics = Metrics()
+
+# Precompiled patterns for the per-row and per-player hot paths.
+# Player strings on Events pages look like "18. Andersson, Henry". Several
+# players are concatenated without separator ("17. Laurin, Sixten24. Karlsson, Theo")
+# and a goal scorer may be followed by a season count ("12. Koivula, Otto (1)").
+# [^\W\d_] is any Unicode letter, so names are not limited to a fixed list of
+# accented characters.
+NAME_WORD = r"[^\W\d_]+(?:['`´’-][^\W\d_]+)*"
+PLAYER_RE = re.compile(rf"(\d{{1,3}})\.\s+({NAME_WORD}(?:\s+{NAME_WORD})*),\s+({NAME_WORD}(?: {NAME_WORD})*)")
+SCORE_RE = re.compile(r"\d+-\d+")
+PENALTY_RE = re.compile(r"(\d+) min")
+TEAM_CLEAN_RE = re.compile(r"\s*\(.*?\)|\s+")
+TEAM_NUMBER_RE = re.compile(r"\s*[12]$")
+ABBREV_NUMBER_RE = re.compile(r"[12]$")
+GAME_LINK_RE = re.compile(r"/Game/Events/(\d+)")
+FULL_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+TIME_ONLY_RE = re.compile(r"\d{2}:\d{2}")
+
+def tokenize_players(player_string):
+    """
+    Split a player string from an Events page into (number, surname, firstname)
+    tuples, one per player in the order they appear.
+    """
+    if not unicodedata.is_normalized("NFC", player_string):
+        player_string = unicodedata.normalize("NFC", player_string)
+    return PLAYER_RE.findall(player_string)
+
+# Local page cache used by fetch_page, set up in main (None disables caching)
+page_cache = None
+
+def create_session(pool_size=10):
+    """
+    Create the HTTP session shared by all fetches. Connections to
+    stats.swehockey.se are pooled and kept alive and responses are gzip
+    compressed. Retries are left to the Crawler.
+    """
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+# Shared HTTP session, recreated in main with a pool sized for --concurrency
+session = create_session()
+
+class TokenBucket:
+    """
+    Allows rate requests per second on average and bursts of up to burst
+    requests. acquire blocks until a token is available (rate 0: no limit).
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class Crawler:
+    """
+    Polite fetching from stats.swehockey.se, used by fetch_page for every request.
+    - A token bucket limits the request rate.
+    - The number of requests in flight adapts (AIMD) between 1 and
+      max_concurrency: it grows by one per round of successful requests and
+      is halved on 429/5xx responses, network errors and latency spikes
+      (a response slower than spike_factor times the average).
+    - timeout is the (connect, read) timeout of each request.
+    - Failed requests are retried up to max_attempts times with jittered
+      exponential backoff (or the Retry-After of a 429), as long as the run
+      wide retry budget (min_retries plus retry_budget per request) lasts.
+    Returns None for a page that could not be fetched, it never raises.
+    """
+    def __init__(self, rate=10.0, burst=None, max_concurrency=1, timeout=(5, 30), max_attempts=4,
+                 retry_budget=0.1, min_retries=10, spike_factor=3.0):
+        self.bucket = TokenBucket(rate, burst or max(1, int(rate)))
+        self.max_concurrency = max(max_concurrency, 1)
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_budget = retry_budget
+        self.min_retries = min_retries
+        self.spike_factor = spike_factor
+        self.limit = 1.0
+        self.in_flight = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    @contextlib.contextmanager
+    def slot(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            self.requests += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.in_flight -= 1
+                self.condition.notify_all()
+
+    def on_success(self, latency):
+        with self.condition:
+            spike = self.latency is not None and latency > self.spike_factor * self.latency
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if spike:
+                self.decrease("latency spike")
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def decrease(self, reason):
+        # At most once per average response time, a burst of failures from the same overload halves once
+        now = time.monotonic()
+        if now - self.last_decrease < (self.latency or 1.0):
+            return
+        self.last_decrease = now
+        self.limit = max(1.0, self.limit / 2)
+        log.debug("Backing off to %d concurrent requests (%s)", int(self.limit), reason)
+
+    def use_retry(self):
+        with self.condition:
+            if self.retries >= self.min_retries + self.retry_budget * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+    def backoff(self, attempt, response=None):
+        retry_after = getattr(response, "headers", {}).get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(int(retry_after), 60)
+        return 0.5 * 2 ** (attempt - 1) * (1 + random.random())
+
+    def get(self, url):
+        response = self.request(url)
+        return None if response is None else response.content
+
+    def request(self, url, headers=None):
+        """
+        GET url with extra headers (e.g. for a conditional request). Returns
+        the response if it is 200 or 304 Not Modified, otherwise None.
+        """
+        delay = 0
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                if not self.use_retry():
+                    log.warning("Retry budget used up, giving up on %s", url)
+                    break
+                time.sleep(delay)
+            self.bucket.acquire()
+            with self.slot():
+                start = time.monotonic()
+                try:
+                    response = session.get(url, headers=headers, timeout=self.timeout)
+                except requests.RequestException as error:
+                    response = None
+                    log.warning("Error fetching %s (attempt %d): %s", url, attempt, error)
+                latency = time.monotonic() - start
+            metrics.observe(f"fetch.{page_type(url)}", latency)
+
+            if response is not None and response.status_code in (200, 304):
+                self.on_success(latency)
+                metrics.count(f"bytes.{page_type(url)}", len(response.content))
+                return response
+            if response is None or response.status_code == 429 or response.status_code >= 500:
+                with self.condition:
+                    self.decrease("error" if response is None else f"status {response.status_code}")
+                if response is not None:
+                    log.warning("Failed to fetch the webpage %s. Status code: %s (attempt %d)",
+                                url, response.status_code, attempt)
+                delay = self.backoff(attempt, response)
+                continue
+            log.warning("Failed to fetch the webpage %s. Status code: %s", url, response.status_code)
+            break
+
+        with self.condition:
+            self.failures += 1
+        return None
 
-DEBUG = 1
+# Crawler used by fetch_page, recreated in main from the command line options
+crawler = Crawler()
 
 # Initialize an empty stats dictionary
 player_stats = {}
@@ -14,6 +412,223 @@ player_stats = {}
 team_name_mapping = {}
 # Canonical team names (base name without suffixes)
 canonical_teams = {}
+# IDs of games already merged into player_stats
+processed_games = set()
+# Games whose pages could not be fetched: game ID -> {"date", "game", "group"}
+failed_games = {}
+
+class ColumnStore:
+    """
+    Rows kept as one compact typed array per column (COLUMNS maps the
+    column names to array typecodes), with every string column holding IDs
+    into a table where each string is interned once, so appending a row
+    allocates no per-row objects.
+    """
+    COLUMNS = {}
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        for name, typecode in self.COLUMNS.items():
+            setattr(self, name, array(typecode))
+
+    def __len__(self):
+        return len(getattr(self, next(iter(self.COLUMNS))))
+
+    def intern(self, value):
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.string_ids[value] = string_id
+            self.strings.append(value)
+        return string_id
+
+    def to_dict(self):
+        state = {"strings": self.strings}
+        for name in self.COLUMNS:
+            state[name] = getattr(self, name).tolist()
+        return state
+
+    def load(self, state):
+        for value in state["strings"]:
+            self.intern(value)
+        for name, typecode in self.COLUMNS.items():
+            setattr(self, name, array(typecode, state[name]))
+
+    def clear(self):
+        self.__init__()
+
+class EventStore(ColumnStore):
+    """
+    Column store for all player events (goals, assists and penalties).
+    Every string (team, player, date, series, game ID) is interned once and
+    an event is one row across the columns.
+    """
+    TYPES = ("goal", "assist", "pim")
+    COLUMNS = {
+        "type": 'b', "minutes": 'h', "team": 'i', "player": 'i',
+        "date": 'i', "series": 'i', "home": 'i', "away": 'i', "game_id": 'i'
+    }
+
+    def append(self, event_type, team, player_name, matchdate, series, home, away, game_id, minutes=0):
+        intern = self.intern
+        self.type.append(self.TYPES.index(event_type))
+        self.minutes.append(minutes)
+        self.team.append(intern(team))
+        self.player.append(intern(player_name))
+        self.date.append(intern(matchdate))
+        self.series.append(intern(series))
+        self.home.append(intern(home))
+        self.away.append(intern(away))
+        self.game_id.append(intern(game_id))
+
+    def row(self, i):
+        """
+        Return event i as (type, minutes, team, player, date, series, home, away, game_id)
+        """
+        strings = self.strings
+        return (self.TYPES[self.type[i]], self.minutes[i], strings[self.team[i]], strings[self.player[i]],
+                strings[self.date[i]], strings[self.series[i]], strings[self.home[i]], strings[self.away[i]],
+                strings[self.game_id[i]])
+
+    def date_order(self, stats):
+        """
+        Return the event indices sorted by date. Events on the same date keep
+        the order of their team and player in stats, then the order they were
+        added in, which is the order the old per-player event lists gave.
+        """
+        import numpy as np
+
+        player_rank = {}
+        for team_rank, (team, players) in enumerate(stats.items()):
+            team_id = self.string_ids.get(team)
+            for rank, name in enumerate(players):
+                player_rank[(team_id, self.string_ids.get(name))] = (team_rank, rank)
+
+        # ISO dates sort the same as strings
+        date_rank = np.zeros(len(self.strings), dtype=np.int64)
+        date_ids = sorted(set(self.date), key=self.strings.__getitem__)
+        date_rank[date_ids] = np.arange(len(date_ids))
+
+        ranks = np.array([player_rank[key] for key in zip(self.team, self.player)], dtype=np.int64).reshape(-1, 2)
+        dates = date_rank[np.frombuffer(self.date, dtype=np.int32)] if len(self) else date_rank[:0]
+        return np.lexsort((np.arange(len(self)), ranks[:, 1], ranks[:, 0], dates))
+
+    def by_player(self):
+        """
+        Return {(team, player_name): [event indices]} in insertion order
+        """
+        groups = {}
+        strings = self.strings
+        for i, key in enumerate(zip(self.team, self.player)):
+            groups.setdefault(key, []).append(i)
+        return {(strings[team], strings[player]): rows for (team, player), rows in groups.items()}
+
+# All player events, added by add_player_goal/add_player_assist/add_player_pim
+event_store = EventStore()
+
+# A player event as returned by EventStore.row, yielded by Scraper.iter_game_events
+PlayerEvent = namedtuple("PlayerEvent", ["type", "minutes", "team", "player", "date", "series", "home", "away", "game_id"])
+
+class GameLog(ColumnStore):
+    """
+    Per-player game log: one row per player and game with the lineup
+    appearances and the goals, assists and PIM of the player in that game,
+    in a ColumnStore like the events. Rows are added as games are merged
+    (in several steps for games followed with --live), and the per-game,
+    per-series and form tables of player_views are computed from it in one
+    vectorized pass.
+    """
+    COLUMNS = {
+        "played": 'h', "goals": 'h', "assists": 'h', "pim": 'h',
+        "team": 'i', "player": 'i', "date": 'i', "series": 'i', "game_id": 'i'
+    }
+
+    def append(self, team, player_name, matchdate, series, game_id, played=0, goals=0, assists=0, pim=0):
+        """Add the row of a player in a game and return its index"""
+        intern = self.intern
+        self.played.append(played)
+        self.goals.append(goals)
+        self.assists.append(assists)
+        self.pim.append(pim)
+        self.team.append(intern(team))
+        self.player.append(intern(player_name))
+        self.date.append(intern(matchdate))
+        self.series.append(intern(series))
+        self.game_id.append(intern(game_id))
+        return len(self) - 1
+
+    def add_game(self, matchdate, series, game_id, appearances=(), event_rows=(), rows=None):
+        """
+        Add the lineup appearances ((team, name, number) tuples) and the
+        event_store rows of a game. rows maps (team, name) to the row of the
+        player in the game; a game merged in several steps passes the same
+        dict each time, so its players keep one row each.
+        """
+        rows = {} if rows is None else rows
+
+        def row(team, player_name):
+            index = rows.get((team, player_name))
+            if index is None:
+                index = rows[(team, player_name)] = self.append(team, player_name, matchdate, series, game_id)
+            return index
+
+        for team, player_name, _ in appearances:
+            self.played[row(team, player_name)] += 1
+        for event_type, minutes, team, player_name, *_ in event_rows:
+            if event_type == "pim":
+                self.pim[row(team, player_name)] += minutes
+            else:
+                getattr(self, f"{event_type}s")[row(team, player_name)] += 1
+
+# Per-player game log of the merged games, set up in main when --splits or --state needs it
+game_log = None
+
+def load_state(filename):
+    """
+    Restore player_stats, team name mappings and processed game IDs saved by
+    save_state, so a new run only has to process games added since then.
+    """
+    if not os.path.exists(filename):
+        log.info("No saved state in %s, starting from scratch", filename)
+        return
+    with open(filename, encoding='utf-8') as f:
+        state = json.load(f)
+    player_stats.update(state["player_stats"])
+    team_name_mapping.update(state["team_name_mapping"])
+    canonical_teams.update(state["canonical_teams"])
+    processed_games.update(state["processed_games"])
+    event_store.load(state["events"])
+    if game_log is not None:
+        if "game_log" in state:
+            game_log.load(state["game_log"])
+        else:
+            log.warning("State in %s has no game log, the --splits tables only cover games processed from now on", filename)
+    for team, players in player_stats.items():
+        team_index.add(team)
+        for player_name, stats in players.items():
+            player_registry.add(team, player_name, stats["number"])
+    log.info("Loaded state from %s: %s games already processed", filename, len(processed_games))
+
+def save_state(filename):
+    """
+    Write the aggregated stats and processed game IDs to filename
+    """
+    state = {
+        "processed_games": sorted(processed_games),
+        "team_name_mapping": team_name_mapping,
+        "canonical_teams": canonical_teams,
+        "player_stats": player_stats,
+        "events": event_store.to_dict()
+    }
+    if game_log is not None:
+        state["game_log"] = game_log.to_dict()
+    # Write to a temporary file first so an interrupted run never leaves a broken state file
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, mode='w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_filename, filename)
+    log.info("State written to %s", filename)
 
 def get_canonical_team_name(team_name):
     """
@@ -32,7 +647,7 @@ def get_canonical_team_name(team_name):
 
     # Remove trailing numbers and common suffixes
     # Pattern: Remove ' 1', ' 2', '1', '2' at the end
-    cleaned = re.sub(r'\s*[12]$', '', team_name)
+    cleaned = TEAM_NUMBER_RE.sub('', team_name)
 
     # Normalize to title case for consistency
     canonical = cleaned.strip()
@@ -41,11 +656,76 @@ def get_canonical_team_name(team_name):
     canonical_teams[team_name] = canonical
     canonical_teams[cleaned] = canonical
 
-    DEBUG == 1 and print(f"Canonical team name: '{team_name}' -> '{canonical}'")
+    log.debug("Canonical team name: '%s' -> '%s'", team_name, canonical)
 
     return canonical
 
-def normalize_team_name(short_name, full_names):
+class TeamNameIndex:
+    """
+    Index of the canonical team names in player_stats, used to resolve the
+    team abbreviations on Events pages ('BOO', 'SKE', 'VÄR1').
+    Full names and every word of them are stored in two prefix tries where
+    each node lists the teams below it in the order they were added, so a
+    lookup is O(len(abbreviation)) and the first team in a node is the one
+    the old linear scan over player_stats picked.
+    """
+    def __init__(self):
+        self.exact = {}
+        self.name_trie = {}
+        self.word_trie = {}
+
+    def add(self, team_name):
+        canonical = get_canonical_team_name(team_name)
+        key = canonical.upper()
+        if key in self.exact:
+            return
+        self.exact[key] = (len(self.exact), canonical)
+        self._insert(self.name_trie, key, canonical)
+        for word in key.split():
+            self._insert(self.word_trie, word, canonical)
+
+    @staticmethod
+    def _insert(trie, key, canonical):
+        # '' never clashes with a character, it holds the teams of a node
+        node = trie
+        for char in [''] + list(key):
+            if char:
+                node = node.setdefault(char, {})
+            teams = node.setdefault('', [])
+            if not teams or teams[-1] != canonical:
+                teams.append(canonical)
+
+    @staticmethod
+    def _prefix_matches(trie, prefix):
+        node = trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get('', [])
+
+    def resolve(self, short_upper, short_base):
+        """
+        Return (team, score, candidates) for an upper case abbreviation and
+        its base without team number. Scores as before: exact match 1.0,
+        start of the full name 0.95, start of any word 0.9.
+        candidates holds every team with the same score.
+        """
+        exact = sorted(self.exact[key] for key in {short_upper, short_base} if key in self.exact)
+        if exact:
+            return exact[0][1], 1.0, [exact[0][1]]
+
+        for trie, score in ((self.name_trie, 0.95), (self.word_trie, 0.9)):
+            candidates = self._prefix_matches(trie, short_base)
+            if candidates:
+                return candidates[0], score, candidates
+
+        return None, 0, []
+
+# Index of the teams in player_stats, kept up to date by ensure_player
+team_index = TeamNameIndex()
+
+def normalize_team_name(short_name):
     """
     Map a short team name (e.g., 'BOO', 'VHF', 'SKE', 'BOO1', 'BOO2') to its canonical full name.
     Handles abbreviations and team number suffixes.
@@ -59,303 +739,897 @@ def normalize_team_name(short_name, full_names):
     short_upper = short_name.upper()
 
     # Remove trailing numbers from short name for matching
-    short_base = re.sub(r'[12]$', '', short_upper)
-
-    best_match = None
-    best_score = 0
+    short_base = ABBREV_NUMBER_RE.sub('', short_upper)
 
-    for full_name in full_names:
-        # Get canonical version of full name
-        canonical = get_canonical_team_name(full_name)
-        canonical_upper = canonical.upper()
-
-        # Exact match with canonical name
-        if short_upper == canonical_upper:
-            best_match = canonical
-            best_score = 1.0
-            break
-
-        # Match short base with canonical
-        if short_base == canonical_upper:
-            best_match = canonical
-            best_score = 1.0
-            break
-
-        # Starts with (BOO matches Boo HC)
-        if canonical_upper.startswith(short_base):
-            score = 0.95
-            if score > best_score:
-                best_score = score
-                best_match = canonical
-
-        # Check if any word starts with the short name (SKE in Skellefteå AIK)
-        words = canonical_upper.split()
-        for word in words:
-            if word.startswith(short_base):
-                score = 0.9
-                if score > best_score:
-                    best_score = score
-                    best_match = canonical
-                break
+    best_match, best_score, candidates = team_index.resolve(short_upper, short_base)
 
     if best_match:
+        if len(candidates) > 1:
+            log.warning("Team '%s' is ambiguous between %s, using '%s'", short_name, ', '.join(candidates), best_match)
         team_name_mapping[short_name] = best_match
-        DEBUG == 1 and print(f"Mapped team: '{short_name}' -> '{best_match}'")
+        log.debug("Mapped team: '%s' -> '%s'", short_name, best_match)
         return best_match
 
     # If no match found, return canonical version of the input
     canonical = get_canonical_team_name(short_name)
     team_name_mapping[short_name] = canonical
-    print(f"WARNING: Could not map team '{short_name}', using canonical: '{canonical}'")
+    log.warning("Could not map team '%s', using canonical: '%s'", short_name, canonical)
     return canonical
 
-def getLineUps(matchid, matchdate, gametext, series):
-    home_team, away_team = map(str.strip, gametext.split(" - "))
-    parsed_home_team = re.sub(r"\s*\(.*?\)|\s+", " ", home_team).strip()
-    parsed_away_team = re.sub(r"\s*\(.*?\)|\s+", " ", away_team).strip()
+# Hyphens, apostrophes and dots in player names, compared as spaces
+PLAYER_NAME_PUNCT_RE = re.compile(r"[-‐-―'`´’.]")
 
-    # Normalize to canonical team names
-    canonical_home_team = get_canonical_team_name(parsed_home_team)
-    canonical_away_team = get_canonical_team_name(parsed_away_team)
+def player_name_key(player_name):
+    """
+    Fold a player name for comparing: accents removed, case folded and
+    hyphens and runs of whitespace as one space ('Ek-Åsplund' -> 'ek asplund')
+    """
+    decomposed = unicodedata.normalize("NFKD", player_name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(PLAYER_NAME_PUNCT_RE.sub(" ", stripped.casefold()).split())
 
-    # URL of the webpage
-    lineUpsUrl = f"https://stats.swehockey.se/Game/LineUps/{matchid}"
-    gameEventsUrl = f"https://stats.swehockey.se/Game/Events/{matchid}"
-    print('Collects lineup from ' + lineUpsUrl)
+class PlayerRegistry:
+    """
+    Integer IDs of the players in player_stats, numbered in the order they
+    were first seen, with the team and name they are counted under.
+    A player is looked up by (team, jersey number, folded name), then by
+    (team, folded name) and finally fuzzily among the players of the team
+    with the same number, whose names may differ in middle names or a
+    misspelling between the LineUps and the Events page. Names from LineUps
+    pages are only matched exactly: the squads of a club ("Värmdö HC 1" and
+    "Värmdö HC 2") share a canonical team, so a similar name with the same
+    number there can be another player.
+    """
+    FUZZY_RATIO = 0.9
+
+    def __init__(self):
+        self.players = []
+        self.seen = {}
+        self.exact = {}
+        self.by_name = {}
+        self.by_number = {}
+
+    def add(self, team, player_name, number):
+        """Register a player without looking for a match among the others and return the ID"""
+        player_id = self.seen.get((team, player_name, number))
+        if player_id is not None and self.players[player_id] == (team, player_name):
+            return player_id
+        player_id = len(self.players)
+        self.players.append((team, player_name))
+        key = player_name_key(player_name)
+        self.seen[(team, player_name, number)] = player_id
+        self.exact.setdefault((team, number, key), player_id)
+        self.by_name.setdefault((team, key), player_id)
+        self.by_number.setdefault((team, number), []).append(player_id)
+        return player_id
+
+    def resolve(self, team, player_name, number, fuzzy=True):
+        """
+        Return the ID of the player, registering a new one if no known
+        player of the team matches. Without fuzzy only a player with the
+        same number and folded name matches.
+        """
+        player_id = self.seen.get((team, player_name, number))
+        if player_id is not None:
+            return player_id
+        key = player_name_key(player_name)
+        player_id = self.exact.get((team, number, key))
+        if player_id is None and not fuzzy:
+            return self.add(team, player_name, number)
+        if player_id is None:
+            player_id = self.by_name.get((team, key))
+        if player_id is None:
+            player_id = self._fuzzy_match(team, key, number)
+            if player_id is not None:
+                log.info("Player '%s' #%s of %s taken to be '%s'", player_name, number, team, self.players[player_id][1])
+        if player_id is None:
+            return self.add(team, player_name, number)
+        self.seen[(team, player_name, number)] = player_id
+        return player_id
+
+    def _fuzzy_match(self, team, key, number):
+        words = set(key.split())
+        for player_id in self.by_number.get((team, number), []):
+            other = player_name_key(self.players[player_id][1])
+            other_words = set(other.split())
+            # One name lists more given names or surnames than the other, or is spelled slightly differently
+            subset = min(len(words), len(other_words)) >= 2 and (words <= other_words or other_words <= words)
+            if subset or SequenceMatcher(None, key, other).ratio() >= self.FUZZY_RATIO:
+                return player_id
+        return None
+
+    def name(self, player_id):
+        """(team, player name) a player is counted under in player_stats"""
+        return self.players[player_id]
+
+# Players in player_stats, kept up to date by ensure_player
+player_registry = PlayerRegistry()
+
+class PageCache:
+    """
+    Persistent cache of downloaded pages stored compressed in SQLite, keyed by URL.
+    Pages marked immutable (finished games) never expire, all other pages
+    (schedules, games not yet played) expire after ttl seconds.
+    - offline: never touch the network, serve whatever is cached (even if expired)
+    - refresh: ignore cached pages and download everything again
+    """
+    def __init__(self, filename, ttl=3600, offline=False, refresh=False):
+        self.ttl = ttl
+        self.offline = offline
+        self.refresh = refresh
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, immutable INTEGER NOT NULL, body BLOB NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            "parser TEXT NOT NULL, version TEXT NOT NULL, digest TEXT NOT NULL, records BLOB NOT NULL, "
+            "PRIMARY KEY (parser, version, digest))"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        if self.refresh:
+            return None
+        with self.lock:
+            row = self.conn.execute("SELECT fetched_at, immutable, body FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        fetched_at, immutable, body = row
+        if immutable or self.offline or time.time() - fetched_at < self.ttl:
+            return zlib.decompress(body)
+        return None
+
+    def put(self, url, content, immutable=False):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched_at, immutable, body) VALUES (?, ?, ?, ?)",
+                (url, time.time(), int(immutable), zlib.compress(content))
+            )
+            self.conn.commit()
+
+    def get_parsed(self, parser, digest):
+        """
+        Records parser returned for the page with hash digest at its current
+        version (see parser_version), or None if they are not cached
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT records FROM parsed WHERE parser = ? AND version = ? AND digest = ?",
+                                    (parser, parser_version(parser), digest)).fetchone()
+        if row is None:
+            return None
+        record_type = PARSER_RECORDS[parser]
+        return [record_type(*record) for record in json.loads(zlib.decompress(row[0]))]
+
+    def put_parsed(self, results):
+        """Store (parser, digest, records) results of the current parser versions"""
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO parsed (parser, version, digest, records) VALUES (?, ?, ?, ?)",
+                [(parser, parser_version(parser), digest, zlib.compress(json.dumps(records).encode()))
+                 for parser, digest, records in results]
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+class StatsDB:
+    """
+    Persistent stats database in SQLite: games, lineup appearances and
+    events, with players numbered in the order they were first seen.
+    Each game is written in one transaction that first removes the rows
+    the game had, so scraping a game again replaces it. Player totals are
+    SQL aggregates, and events are indexed by game, player and team/series/type.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            game_id TEXT PRIMARY KEY, date TEXT NOT NULL, series TEXT, home TEXT, away TEXT, scraped_at REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY, team TEXT NOT NULL, name TEXT NOT NULL, number TEXT, UNIQUE (team, name));
+        CREATE TABLE IF NOT EXISTS lineups (game_id TEXT NOT NULL, player_id INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY, game_id TEXT NOT NULL, type TEXT NOT NULL, minutes INTEGER NOT NULL,
+            player_id INTEGER NOT NULL, team TEXT NOT NULL, series TEXT);
+        CREATE INDEX IF NOT EXISTS games_date ON games (date);
+        CREATE INDEX IF NOT EXISTS lineups_game ON lineups (game_id);
+        CREATE INDEX IF NOT EXISTS lineups_player ON lineups (player_id);
+        CREATE INDEX IF NOT EXISTS events_game ON events (game_id);
+        CREATE INDEX IF NOT EXISTS events_player ON events (player_id);
+        CREATE INDEX IF NOT EXISTS events_team_series ON events (team, series, type);
+    """
 
-    # Send a GET request to fetch the webpage content
-    response = requests.get(lineUpsUrl)
+    def __init__(self, filename):
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.player_ids = {}
+        for player_id, team, name, number in self.conn.execute("SELECT id, team, name, number FROM players ORDER BY id"):
+            self.player_ids[(team, name)] = player_id
+            # Players of earlier runs keep the name they are stored under
+            player_registry.add(team, name, number)
+
+    def player_id(self, team, name):
+        player_id = self.player_ids.get((team, name))
+        if player_id is None:
+            cursor = self.conn.execute("INSERT INTO players (team, name, number) VALUES (?, ?, ?)",
+                                       (team, name, player_stats[team][name]["number"]))
+            player_id = self.player_ids[(team, name)] = cursor.lastrowid
+        return player_id
+
+    def store_game(self, game_id, matchdate, series, home, away, appearances, event_rows):
+        """
+        Replace the rows of a game with its lineup appearances
+        ((team, name, number) tuples) and event_store rows
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM lineups WHERE game_id = ?", (game_id,))
+            self.conn.execute("DELETE FROM events WHERE game_id = ?", (game_id,))
+            self.conn.execute("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?)",
+                              (game_id, matchdate, series, home, away, time.time()))
+            self.conn.executemany("INSERT INTO lineups (game_id, player_id) VALUES (?, ?)",
+                                  [(game_id, self.player_id(team, name)) for team, name, _ in appearances])
+            self.conn.executemany(
+                "INSERT INTO events (game_id, type, minutes, player_id, team, series) VALUES (?, ?, ?, ?, ?, ?)",
+                [(game_id, event_type, minutes, self.player_id(team, name), team, series)
+                 for event_type, minutes, team, name, *_ in event_rows]
+            )
+
+    def player_totals(self):
+        """
+        Return the totals of every player in the database, in the same shape
+        and order as player_stats: teams and players in first seen order.
+        """
+        totals = {}
+        rows = self.conn.execute("""
+            WITH played AS (
+                SELECT player_id, COUNT(*) AS games_played FROM lineups GROUP BY player_id),
+            scored AS (
+                SELECT player_id, SUM(type = 'goal') AS goals, SUM(type = 'assist') AS assists,
+                       SUM(CASE WHEN type = 'pim' THEN minutes ELSE 0 END) AS pim
+                FROM events GROUP BY player_id)
+            SELECT p.team, p.name, p.number, COALESCE(games_played, 0), COALESCE(goals, 0),
+                   COALESCE(assists, 0), COALESCE(pim, 0)
+            FROM players p
+            LEFT JOIN played ON played.player_id = p.id
+            LEFT JOIN scored ON scored.player_id = p.id
+            WHERE played.player_id IS NOT NULL OR scored.player_id IS NOT NULL
+            ORDER BY MIN(p.id) OVER (PARTITION BY p.team), p.id
+        """)
+        for team, name, number, games_played, goals, assists, pim in rows:
+            totals.setdefault(team, {})[name] = {
+                "number": number,
+                "goals": goals,
+                "assists": assists,
+                "pim": pim,
+                "games_played": games_played
+            }
+        return totals
+
+    def load_events(self):
+        """
+        Return all events in the database as an EventStore, in the order they were stored
+        """
+        events = EventStore()
+        rows = self.conn.execute("""
+            SELECT e.type, e.team, p.name, g.date, g.series, g.home, g.away, e.game_id, e.minutes
+            FROM events e JOIN players p ON p.id = e.player_id JOIN games g ON g.game_id = e.game_id
+            ORDER BY e.id
+        """)
+        for row in rows:
+            events.append(*row)
+        return events
+
+    def load_game_log(self):
+        """
+        Return the appearances, goals, assists and PIM of every player in
+        every game in the database as a GameLog, games in date order
+        """
+        player_games = GameLog()
+        rows = self.conn.execute("""
+            WITH played AS (
+                SELECT game_id, player_id, COUNT(*) AS played FROM lineups GROUP BY game_id, player_id),
+            scored AS (
+                SELECT game_id, player_id, SUM(type = 'goal') AS goals, SUM(type = 'assist') AS assists,
+                       SUM(CASE WHEN type = 'pim' THEN minutes ELSE 0 END) AS pim
+                FROM events GROUP BY game_id, player_id),
+            game_players AS (
+                SELECT game_id, player_id FROM played UNION SELECT game_id, player_id FROM scored)
+            SELECT p.team, p.name, g.date, g.series, gp.game_id, COALESCE(played, 0), COALESCE(goals, 0),
+                   COALESCE(assists, 0), COALESCE(pim, 0)
+            FROM game_players gp
+            JOIN players p ON p.id = gp.player_id
+            JOIN games g ON g.game_id = gp.game_id
+            LEFT JOIN played ON played.game_id = gp.game_id AND played.player_id = gp.player_id
+            LEFT JOIN scored ON scored.game_id = gp.game_id AND scored.player_id = gp.player_id
+            ORDER BY g.date, g.rowid, p.id
+        """)
+        for row in rows:
+            player_games.append(*row)
+        return player_games
+
+    def close(self):
+        self.conn.close()
+
+# Stats database written per game, set up in main (None keeps stats in memory only)
+stats_db = None
+
+def fetch_page(url, immutable=False):
+    """
+    Return the content of url as bytes, or None if it could not be fetched.
+    The page cache is consulted first, a cache hit never touches the network.
+    """
+    if page_cache is not None:
+        content = page_cache.get(url)
+        metrics.count(f"cache_{'miss' if content is None else 'hit'}.{page_type(url)}")
+        if content is not None:
+            log.debug("Using cached page %s", url)
+            return content
+        if page_cache.offline:
+            log.warning("Page not in cache (offline): %s", url)
+            return None
+
+    content = crawler.get(url)
+    if content is not None and page_cache is not None:
+        page_cache.put(url, content, immutable)
+    return content
+
+def lineups_url(matchid):
+    return f"https://stats.swehockey.se/Game/LineUps/{matchid}"
+
+def events_url(matchid):
+    return f"https://stats.swehockey.se/Game/Events/{matchid}"
+
+def fetch_game_pages(game):
+    """
+    Download the LineUps and Events pages for a (matchid, finished) pair.
+    Returns (lineups_content, events_content) so the pages can be fetched
+    ahead of time and handed to getLineUps/getGameStats. Pages of finished
+    games never change and are cached without expiry.
+    """
+    matchid, finished = game
+    return fetch_page(lineups_url(matchid), finished), fetch_page(events_url(matchid), finished)
 
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Parse the HTML content with BeautifulSoup
-        print('Parsings lineup from ' + lineUpsUrl)
-        soup = BeautifulSoup(response.content, 'html.parser')
+def prefetch(func, items, concurrency=1, executor=None):
+    """
+    Yield func(item) for each item, in the same order as items.
+    With concurrency > 1 up to that many calls run in a thread pool (or in
+    executor, e.g. the parse process pool) while earlier results are being
+    consumed, so the caller sees exactly the same sequence as a sequential run.
+    items may itself be a prefetch generator, which chains the stages.
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield func(item)
+        return
 
-        # Find all div elements with the class 'lineUpPlayer'
-        line_up_players = soup.find_all('div', class_='lineUpPlayer')
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            yield from prefetch(func, items, concurrency, executor)
+        return
 
-        # Loop through the divs and extract the preceding <h3> and format player names
-        for player in line_up_players:
-            # Find the preceding <h3> for each lineUpPlayer
-            team_name = player.find_previous('h3').text.strip()
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        # Keep a bounded number of pages in flight
+        if len(pending) >= concurrency * 2:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# Process pool shared by all schedules for parsing pages, set up in main (None parses in this process)
+parse_pool = None
+
+def init_parse_worker(log_queue, level):
+    """Send the log records of a parse worker back to the main process"""
+    log.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    log.setLevel(level)
+    log.propagate = False
+
+def create_parse_pool(workers):
+    """
+    Start a process pool with workers processes for parse_game_pages, so
+    HTML parsing is not limited to one core by the GIL. Log records from
+    the workers are written by the handlers of this process.
+    """
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *(log_handlers or [logging.lastResort]),
+                                              respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_parse_worker,
+                               initargs=(log_queue, log.getEffectiveLevel()))
+
+# Version of each parser whose results are memoized in the page cache. Bump the
+# version of a parser when a change alters its output: only that parser then
+# runs again on cached pages, the results of the others are still reused.
+PARSER_VERSIONS = {"lineup": 1, "events": 1, "goals": 1, "penalties": 1}
+# Parsers that work on the results of another parser rather than on a page
+PARSER_INPUTS = {"goals": "events", "penalties": "events"}
+
+def parser_version(parser):
+    """Version of parser including the versions of the parsers its input comes from, e.g. '1.2'"""
+    version = str(PARSER_VERSIONS[parser])
+    if parser in PARSER_INPUTS:
+        version = f"{parser_version(PARSER_INPUTS[parser])}.{version}"
+    return version
+
+def page_digest(content):
+    return hashlib.sha1(content).hexdigest()
+
+def parse_game_pages(item):
+    """
+    Parse the pages of a game given as (lineups_content, events_content, cached),
+    where cached holds results already known by parser name (see PARSER_VERSIONS).
+    Returns the results of all parsers: the LineupPlayer records of the lineup,
+    the GameEvent rows and the GoalRecord and PenaltyRecord records made of
+    them, and the seconds each parser that ran took. Results of a page that
+    could not be fetched are missing. Only depends on its argument, so it
+    can run in a parse worker process.
+    """
+    lineups_content, events_content, cached = item
+    results = dict(cached)
+    timings = {}
+
+    def run(parser, func, argument):
+        start = time.perf_counter()
+        results[parser] = func(argument)
+        timings[parser] = time.perf_counter() - start
+
+    if lineups_content is not None and "lineup" not in results:
+        run("lineup", parse_lineup, lineups_content)
+    if events_content is not None and not ("goals" in results and "penalties" in results):
+        if "events" not in results:
+            run("events", parse_game_events, events_content)
+        if "goals" not in results:
+            run("goals", parse_goals, results["events"])
+        if "penalties" not in results:
+            run("penalties", parse_penalties, results["events"])
+    return results, timings
+
+def parse_games(pages, parse_workers=1):
+    """
+    Yield the parse results (see parse_game_pages) of each game's
+    (lineups_content, events_content) pages, in the same order. Results
+    memoized in the page cache for the same page content and parser version
+    are reused, the others are computed (in parse_pool with parse_workers > 1)
+    and memoized. The GameEvent rows are only looked up when the goal or
+    penalty records have to be made again.
+    """
+    lookups = deque()
+
+    def with_cached(pages):
+        for lineups_content, events_content in pages:
+            digests = {}
+            if lineups_content is not None:
+                digests["lineup"] = page_digest(lineups_content)
+            if events_content is not None:
+                digests["goals"] = digests["penalties"] = digests["events"] = page_digest(events_content)
+            cached = {}
+            if page_cache is not None:
+                for parser in ("lineup", "goals", "penalties", "events"):
+                    if parser not in digests or (parser == "events" and "goals" in cached and "penalties" in cached):
+                        continue
+                    records = page_cache.get_parsed(parser, digests[parser])
+                    metrics.count(f"cache_{'miss' if records is None else 'hit'}.parsed_{parser}")
+                    if records is not None:
+                        cached[parser] = records
+            lookups.append((digests, cached))
+            # Pages whose results are all cached need not be sent to a parse worker
+            if "lineup" in cached:
+                lineups_content = None
+            if "goals" in cached and "penalties" in cached:
+                events_content = None
+            yield lineups_content, events_content, cached
+
+    for results, timings in prefetch(parse_game_pages, with_cached(pages), parse_workers, parse_pool):
+        digests, cached = lookups.popleft()
+        for parser, seconds in timings.items():
+            metrics.observe(f"parse.{parser}", seconds)
+        new_results = [(parser, digests[parser], records) for parser, records in results.items() if parser not in cached]
+        if page_cache is not None and new_results:
+            page_cache.put_parsed(new_results)
+        yield results
+
+# One player in the lineup of a Game/LineUps page
+LineupPlayer = namedtuple("LineupPlayer", ["team", "number", "firstname", "lastname"])
+
+def parse_lineup(content):
+    """
+    Extract the players from a Game/LineUps page in a single forward pass
+    over the document. The most recent <h3> is the team heading for every
+    div.lineUpPlayer that follows it.
+    Returns a list of LineupPlayer records in page order.
+    """
+    doc = lxml_html.fromstring(content)
+    players = []
+    team_name = None
+
+    for element in doc.iter('h3', 'div'):
+        if element.tag == 'h3':
+            # Remove the part in parentheses and extra spaces
+            team_name = TEAM_CLEAN_RE.sub(" ", element.text_content().strip()).strip()
+            continue
+        if 'lineUpPlayer' not in element.get('class', '').split():
+            continue
+
+        raw_player_text = element.text_content().strip().replace('\n', ' ')
+        try:
+            # Split the player text ("18. Andersson, Henry") into number and name parts
+            number, name = raw_player_text.split('.', 1)
+            lastname, firstname = [n.strip() for n in name.split(',', 1)]
+        except ValueError:
+            log.warning("Invalid format for player: %s", raw_player_text)
+            continue
+        if team_name is None:
+            log.warning("No team heading found for player: %s", raw_player_text)
+            continue
+        players.append(LineupPlayer(team_name, number, firstname, lastname))
+
+    return players
+
+def game_teams(gametext):
+    """
+    Canonical (home, away) team names of a schedule game text ("Home - Away")
+    """
+    home_team, away_team = map(str.strip, gametext.split(" - "))
+    parsed_home_team = TEAM_CLEAN_RE.sub(" ", home_team).strip()
+    parsed_away_team = TEAM_CLEAN_RE.sub(" ", away_team).strip()
 
-            # Extract and clean up player text
-            raw_player_text = player.text.strip().replace('\n', ' ')
+    # Normalize to canonical team names
+    return get_canonical_team_name(parsed_home_team), get_canonical_team_name(parsed_away_team)
 
-            # Parse the player number, first name, and last name
-            try:
-                # Split the player text into number and name parts
-                number, name = raw_player_text.split('.', 1)
-                lastname, firstname = [n.strip() for n in name.split(',', 1)]
-                formatted_name = f"{number.strip()},{firstname} {lastname}"
-            except ValueError:
-                formatted_name = f"Invalid format for player: {raw_player_text}"
-            # Parse to remove the part in parentheses and extra spaces
-            team_name = re.sub(r"\s*\(.*?\)|\s+", " ", team_name).strip()
-
-            # Normalize team name to canonical form
-            canonical_team_name = get_canonical_team_name(team_name)
-
-            player_name = f"{firstname} {lastname}"
-            ensure_player(player_stats, canonical_team_name, f"{player_name}", number)
-            DEBUG == 1 and print(f"Game played Team: {canonical_team_name} (from {team_name}) Player: {player_name}")
+def lineup_appearances(players):
+    """
+    (canonical team, player name, number) of each LineupPlayer, as counted in player_stats.
+    Lineup names are matched exactly, see PlayerRegistry.
+    """
+    appearances = []
+    for player in players:
+        team = get_canonical_team_name(player.team)
+        player_id = player_registry.resolve(team, f"{player.firstname} {player.lastname}", player.number, fuzzy=False)
+        appearances.append((*player_registry.name(player_id), player.number))
+    return appearances
+
+def getLineUps(matchid, matchdate, gametext, series, players=None):
+    canonical_home_team, canonical_away_team = game_teams(gametext)
+
+    # URL of the webpage
+    lineUpsUrl = lineups_url(matchid)
+    log.debug("Collects lineup from %s", lineUpsUrl)
+
+    # Fetch and parse the webpage unless already done by the pipeline
+    if players is None:
+        content = fetch_page(lineUpsUrl)
+        if content is not None:
+            log.debug("Parsings lineup from %s", lineUpsUrl)
+            players = parse_lineup(content)
+
+    # Check if the request was successful
+    if players is not None:
+        for canonical_team_name, player_name, number in lineup_appearances(players):
+            canonical_team_name, player_name = ensure_player(player_stats, canonical_team_name, player_name, number)
+            log.debug("Game played Team: %s Player: %s", canonical_team_name, player_name)
             player_stats[canonical_team_name][player_name]["games_played"] += 1
         return canonical_home_team, canonical_away_team
     else:
-        print(f"Failed to fetch the webpage. Status code: {response.status_code}")
+        log.warning("Failed to fetch lineup for %s", matchid)
         return (None, None)
    
 def ensure_player(stats, team, player_name, number):
+    """
+    Make sure the player is in stats and return the (team, name) the player
+    is counted under, which differs from the given ones when player_registry
+    matches the player to one already known under another spelling
+    """
+    team, player_name = player_registry.name(player_registry.resolve(team, player_name, number))
     if team not in stats:
         stats[team] = {}
+        team_index.add(team)
     if player_name not in stats[team]:
-        print(f"Adding player to Team: {team} Name: {player_name}")
+        log.debug("Adding player to Team: %s Name: %s", team, player_name)
         stats[team][player_name] = {
             "number": number,
             "goals": 0,
             "assists": 0,
             "pim": 0,
-            "games_played": 0,
-            "events": []
+            "games_played": 0
         }
-        
+    return team, player_name
+
 def add_player_goal(stats, team, player_name, number, matchdate, series, home, away, game_id):
-    ensure_player(stats, team, player_name, number)
+    team, player_name = ensure_player(stats, team, player_name, number)
 
     stats[team][player_name]["goals"] += 1
-    DEBUG == 1 and print(f"add_player_goal for {matchdate},{series},{home},{away},{team},{player_name}")
-
-    stats[team][player_name]["events"].append({
-        "type": "goal",
-        "date": matchdate,
-        "series": series,
-        "home": home,
-        "away": away,
-        "game_id": game_id
-    })
+    log.debug("add_player_goal for %s,%s,%s,%s,%s,%s", matchdate, series, home, away, team, player_name)
+
+    event_store.append("goal", team, player_name, matchdate, series, home, away, game_id)
 
     return stats
     
 def add_player_assist(stats, team, player_name, number, matchdate, series, home, away, game_id):
-    ensure_player(stats, team, player_name, number)
+    team, player_name = ensure_player(stats, team, player_name, number)
 
     stats[team][player_name]["assists"] += 1
-    DEBUG == 1 and print(f"add_player_assist for {matchdate},{series},{home},{away},{team},{player_name}")
-
-    stats[team][player_name]["events"].append({
-        "type": "assist",
-        "date": matchdate,
-        "series": series,
-        "home": home,
-        "away": away,
-        "game_id": game_id
-    })
+    log.debug("add_player_assist for %s,%s,%s,%s,%s,%s", matchdate, series, home, away, team, player_name)
+
+    event_store.append("assist", team, player_name, matchdate, series, home, away, game_id)
 
     return stats
 
 def add_player_pim(stats, team, player_name, number, pim, matchdate, series, home, away, game_id):
-    ensure_player(stats, team, player_name, number)
+    team, player_name = ensure_player(stats, team, player_name, number)
 
     stats[team][player_name]["pim"] += pim
-    stats[team][player_name]["events"].append({
-        "type": "pim",
-        "minutes": pim,
-        "date": matchdate,
-        "series": series,
-        "home": home,
-        "away": away,
-        "game_id": game_id
-    })
+    event_store.append("pim", team, player_name, matchdate, series, home, away, game_id, pim)
 
     return stats
 
-def getGameStats(game_id, serie, matchdate, gametext):
-    home_goals = 0
-    away_goals = 0
-    home_team, away_team = map(str.strip, gametext.split(" - "))
-    parsed_home_team = re.sub(r"\s*\(.*?\)|\s+", " ", home_team).strip()
-    parsed_away_team = re.sub(r"\s*\(.*?\)|\s+", " ", away_team).strip()
+# One row of the Actions table on a Game/Events page
+GameEvent = namedtuple("GameEvent", ["time", "event", "team", "players"])
 
-    # Normalize to canonical team names
-    canonical_home_team = get_canonical_team_name(parsed_home_team)
-    canonical_away_team = get_canonical_team_name(parsed_away_team)
-
-    DEBUG == 1 and print(f"Processing gamestats for Matchdate: {matchdate} Serie: {serie} Home Team: {canonical_home_team}, Away Team: {canonical_away_team}")
-
-    url = 'http://stats.swehockey.se/Game/Events/' + game_id
-    df_gamedata = pd.read_html(url, match='Actions', attrs={'class': 'tblContent'}, displayed_only=False)
-
-    # Get relevant columns, rename and only keep rows with time (length: 5)
-    df_gameevents = df_gamedata[1].iloc[:, [0, 1, 2, 3, 4]]
-
-    df_gameevents.columns = ['time', 'event', 'team', 'players', 'on_ice']
-
-    df_gameevents = df_gameevents[df_gameevents['time'].str.len() == 5]
-    df_gameevents['game_id'] = game_id
-
-    for _, row in df_gameevents.iloc[::-1].iterrows():
-        time = row['time']
-        event = row['event']
-        team = row['team']
-        players_str = row['players']
-
-        # Only process rows that represent goals or assists (e.g., 6-3, 4-2, etc.)
-        DEBUG == 1 and print(f"Processing '{event}' {team} {time}: {players_str}")
-        if isinstance(event, str) and re.match(r"\d+-\d+.*", event):  # Check if event is a score (e.g., 6-3)
-            DEBUG == 1 and print(f"Goal found for {matchdate}  {event} {team} {time}: {players_str}")
-            goal_event = event.split(' ')[0]  # Get the score part (e.g., '6-3')
-            new_home, new_away = map(int, goal_event.split('-'))
-            scoring_team = ""
-            # Avgör vilket lag som gjorde målet
-            if new_home != home_goals:
-                DEBUG == 1 and print(f"Scoring team {canonical_home_team}")
-                home_goals = new_home
-                scoring_team = canonical_home_team
-            elif new_away != away_goals:
-                DEBUG == 1 and print(f"Scoring team {canonical_away_team}")
-                away_goals = new_away
-                scoring_team = canonical_away_team
-
-            players = parse_goal(players_str, matchdate, serie, scoring_team, canonical_home_team, canonical_away_team, game_id)
-        elif not pd.isna(event) and re.match(r"(\d+ min)", event):
-            match = re.match(r"(\d+) min", event)
-            pim = int(match.group(1))
+# Same whitespace folding as pandas.read_html applies to table cells
+CELL_WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")
+
+def parse_game_events(content):
+    """
+    Parse the Actions table of a Game/Events page with lxml.
+    Returns the rows with a game time (mm:ss) as GameEvent records in
+    chronological order (the page lists the latest event first).
+    Cell texts are the same as pd.read_html would produce, empty cells are ''.
+    """
+    doc = lxml_html.fromstring(content)
+    # The Actions table is the second tblContent table mentioning 'Actions'
+    tables = doc.xpath("//table[@class='tblContent'][.//text()[contains(., 'Actions')]]")
+    if len(tables) < 2:
+        log.error("Could not find the Actions table")
+        return []
+    table = tables[1]
+
+    for br in table.iter('br'):
+        br.tail = "\n" + (br.tail or "")
+
+    rows = table.xpath(".//tbody//tr") + table.xpath("./tr") + table.xpath(".//tfoot//tr")
+    # Leading rows with only <th> cells are the table header
+    if not table.xpath(".//thead"):
+        while rows and all(cell.tag == 'th' for cell in rows[0].xpath("./td|./th")):
+            rows.pop(0)
+
+    events = []
+    for row in rows:
+        # Cell texts of the first four columns (time, event, team, players)
+        texts = []
+        for cell in row.xpath("./td|./th"):
+            text = CELL_WHITESPACE_RE.sub(" ", cell.text_content().strip())
+            texts.extend([text] * int(cell.get('colspan') or 1))
+            if len(texts) >= 4:
+                break
+        if not texts or len(texts[0]) != 5:
+            continue
+        texts.extend([''] * (4 - len(texts)))
+        events.append(GameEvent(*texts[:4]))
+
+    events.reverse()
+    return events
+
+def getGameStats(game_id, serie, matchdate, gametext, goals=None, penalties=None):
+    canonical_home_team, canonical_away_team = game_teams(gametext)
+
+    log.debug("Processing gamestats for Matchdate: %s Serie: %s Home Team: %s, Away Team: %s", matchdate, serie, canonical_home_team, canonical_away_team)
+
+    if goals is None or penalties is None:
+        content = fetch_page(events_url(game_id))
+        if content is None:
+            log.warning("Failed to fetch game events for %s", game_id)
+            return
+        events = parse_game_events(content)
+        goals, penalties = parse_goals(events), parse_penalties(events)
+    apply_game_events(game_id, serie, matchdate, canonical_home_team, canonical_away_team, goals, penalties)
+
+# A goal row of a Game/Events page: its row number, the score after the goal and the
+# (number, surname, firstname) of the goal scorer followed by those of the assists
+GoalRecord = namedtuple("GoalRecord", ["row", "home_goals", "away_goals", "players"])
+# A penalty row of a player: its row number, the team as written on the page and the penalty minutes
+PenaltyRecord = namedtuple("PenaltyRecord", ["row", "team", "pim", "number", "surname", "firstname"])
+
+# Record type of the results of each parser in PARSER_VERSIONS
+PARSER_RECORDS = {"lineup": LineupPlayer, "events": GameEvent, "goals": GoalRecord, "penalties": PenaltyRecord}
+
+def parse_goals(events):
+    """GoalRecord of each goal among GameEvent rows"""
+    goals = []
+    for row, (game_time, event, team, players_str) in enumerate(events):
+        # Only rows whose event is a score (e.g., 6-3) are goals
+        if SCORE_RE.match(event):
+            log.debug("Processing '%s' %s %s: %s", event, team, game_time, players_str)
+            goals.append(parse_goal(row, event, players_str))
+    return goals
+
+def parse_penalties(events):
+    """PenaltyRecord of each penalty of a player among GameEvent rows"""
+    penalties = []
+    for row, (game_time, event, team, players_str) in enumerate(events):
+        penalty = PENALTY_RE.match(event)
+        if penalty and not SCORE_RE.match(event):
+            log.debug("Processing '%s' %s %s: %s", event, team, game_time, players_str)
+            pim = int(penalty.group(1))
             if pim == 1:
                 pim = 2
-            DEBUG == 1 and print(f"Penalty found for {matchdate} {event} {team} {time}: {players_str} {match.group(1)}")
-            playes = parse_penalty(players_str, matchdate, serie, team, pim, canonical_home_team, canonical_away_team, game_id)
+            record = parse_penalty(row, players_str, team, pim)
+            if record is not None:
+                penalties.append(record)
+    return penalties
 
+def apply_game_events(game_id, serie, matchdate, canonical_home_team, canonical_away_team, goals, penalties,
+                      home_goals=0, away_goals=0):
+    """
+    Add the GoalRecord and PenaltyRecord records of a game to player_stats,
+    in the order of their rows. The score before the first goal is
+    home_goals-away_goals (0-0 unless the records continue an earlier part
+    of the game), the score after the last goal is returned.
+    """
+    for record in heapq.merge(goals, penalties, key=lambda record: record.row):
+        if isinstance(record, PenaltyRecord):
+            apply_penalty(record, matchdate, serie, canonical_home_team, canonical_away_team, game_id)
+            continue
+        log.debug("Goal found for %s %s-%s: %s", matchdate, record.home_goals, record.away_goals, record.players)
+        scoring_team = ""
+        # Avgör vilket lag som gjorde målet
+        if record.home_goals != home_goals:
+            log.debug("Scoring team %s", canonical_home_team)
+            home_goals = record.home_goals
+            scoring_team = canonical_home_team
+        elif record.away_goals != away_goals:
+            log.debug("Scoring team %s", canonical_away_team)
+            away_goals = record.away_goals
+            scoring_team = canonical_away_team
+        apply_goal(record, matchdate, serie, scoring_team, canonical_home_team, canonical_away_team, game_id)
+    return home_goals, away_goals
+
+
+def parse_penalty(row, player_string, team, pim):
+    """PenaltyRecord of a penalty row, None for a bench penalty or players string that cannot be parsed"""
+    log.debug("Parsing '%s'", player_string)
+
+    # Bench penalties have no player
+    if player_string.startswith("Team"):
+        return None
+
+    players = tokenize_players(player_string)
+    if not players:
+        log.error("Could not parse penalty %s", player_string)
+        return None
+
+    # Player number, surname and firstname, e.g. ("18", "Andersson", "Henry")
+    number, surname, firstname = players[0]
+    return PenaltyRecord(row, team, pim, number, surname, firstname)
+
+def apply_penalty(record, matchdate, serie, home_team, away_team, game_id):
+    # Normalize team name to match lineup teams
+    normalized_team = normalize_team_name(record.team)
 
-def parse_penalty(player_string, matchdate, serie, team, time, home_team, away_team, game_id):
-    # Updated regex to handle special characters including Scandinavian ones like 'ø', 'å', etc.
-    # Updated regex to handle accented characters like 'é', 'è', 'ø', etc., and hyphenated last names
-    pattern = r"(\d+)\.\s+([A-Za-zÅÄÖåäöÉéèÁáÀàÁáøØüæ'`-]+(?:\s+[A-Za-zÅÄÖåäöÉéèÁáÀàÁáøØüæ'`-]+)*),\s+([A-Za-zÅÄÖåäöÉéèÁáÀàÁáøØü'`-]+)"
-    #pattern = r"(\d+)\.\s+([A-Za-zÅÄÖåäöÉéÁáÀàÁáøØ-]+(?:\s+[A-Za-zÅÄÖåäöÉéÁáÀàÁáøØ-]+)*),\s+([A-Za-zÅÄÖåäöÉéÁáÀàÁáøØ]+)"
-    match = re.match(pattern, player_string)
+    add_player_pim(player_stats, normalized_team, f"{record.firstname} {record.surname}", record.number, record.pim, matchdate, serie, home_team, away_team, game_id)
+    log.debug("Penalty added for Player: Number='%s', Name='%s %s' Team: %s", record.number, record.firstname, record.surname, normalized_team)
 
-    DEBUG == 1 and print(f"Parsing '{player_string}'")
 
-    team_penalty = re.match("Team.*", player_string)
-    if team_penalty:
+# Function to process the players_event string
+def parse_goal(row, event, input_string):
+    """GoalRecord of a goal row, whose event starts with the score after the goal (e.g. '6-3')"""
+    goal_event = event.split(' ')[0]  # Get the score part (e.g., '6-3')
+    home_goals, away_goals = map(int, goal_event.split('-'))
+    # Goal scorer followed by the assists
+    players = tokenize_players(input_string)
+    if not players:
+        log.error("Could not parse %s", input_string)
+    return GoalRecord(row, home_goals, away_goals, players)
+
+def apply_goal(record, matchdate, serie, team, home_team, away_team, game_id):
+    if not record.players:
         return
+    # Normalize team name to match lineup teams
+    normalized_team = normalize_team_name(team)
 
-    number = match.group(1)  # Player number, e.g., "18"
-    surname = match.group(2)  # Surname, e.g., "Andersson"
-    firstname = match.group(3)  # Firstname, e.g., "Henry"
+    # Goal scorer (first match)
+    goal_number, goal_surname, goal_firstname = record.players[0]
+    add_player_goal(player_stats, normalized_team, f"{goal_firstname} {goal_surname}", goal_number, matchdate, serie, home_team, away_team, game_id)
+    log.debug("Date: %s  Team: %s Serie: %s Goal Scorer: #%s '%s %s'", matchdate, normalized_team, serie, goal_number, goal_firstname, goal_surname)
 
-    # Normalize team name to match lineup teams
-    normalized_team = normalize_team_name(team, list(player_stats.keys()))
+    # Assists (remaining matches)
+    for assist_number, assist_surname, assist_firstname in record.players[1:]:
+        add_player_assist(player_stats, normalized_team, f"{assist_firstname} {assist_surname}", assist_number, matchdate, serie, home_team, away_team, game_id)
+        log.debug("Date: %s Team: %s Serie: %s Assist: #%s '%s %s'", matchdate, normalized_team, serie, assist_number, assist_firstname, assist_surname)
 
-    add_player_pim(player_stats, normalized_team, f"{firstname} {surname}", number, time, matchdate, serie, home_team, away_team, game_id)
-    DEBUG == 1 and print(f"Penalty added for Player: Number='{number}', Name='{firstname} {surname}' Team: {normalized_team}")
+def getAllScheduledGames(schedule_id, concurrency=1, incremental=False, parse_workers=1):
+    """
+    Get all games from a schedule ID and process lineups and game statistics.
+    With concurrency > 1 the LineUps and Events pages are downloaded in
+    parallel, and with parse_workers > 1 they are parsed in parse_pool while
+    later games are downloaded. Games are still merged into player_stats one
+    at a time in schedule order, so the result does not depend on either.
+    Games in processed_games are skipped. With incremental=True games from
+    today are also left for a later run, as they may still be in progress.
+    """
+    games = pending_games(schedule_games(schedule_id), incremental)
+    process_games(games, f"Schedule {schedule_id}", concurrency, parse_workers)
 
+def pending_games(games, incremental=False):
+    """
+    The games of a schedule that still have to be processed: games in
+    processed_games are skipped, and with incremental=True games from today
+    as well, as they may still be in progress.
+    """
+    pending = []
+    today = date.today().isoformat()
+    for matchid, matchdate, game_text, group_text in games:
+        if matchid in processed_games:
+            log.debug("Skipping already processed game %s", matchid)
+        elif incremental and matchdate >= today:
+            log.info("Skipping game %s on %s, it may not be finished yet", matchid, matchdate)
+        else:
+            pending.append((matchid, matchdate, game_text, group_text))
+    return pending
 
-# Function to process the players_event string
-def parse_goal(input_string, matchdate, serie, team, home_team, away_team, game_id):
-    # parse_goal expression to match both goal scorer and assist (ensuring no digits in names)
-    pattern = r"(\d{1,2})\.\s+([A-Za-zåäöÅÄÖ-]+),\s+([A-Za-zåäöÅÄÖ-]+)"
-
-    # Find all matches
-    matches = re.findall(pattern, input_string)
-    # Process the matches to assign goal scorer and assist
-    if len(matches) >= 1:
-        # Normalize team name to match lineup teams
-        normalized_team = normalize_team_name(team, list(player_stats.keys()))
-
-        # Goal scorer (first match)
-        goal_number, goal_surname, goal_firstname = matches[0]
-        add_player_goal(player_stats, normalized_team, f"{goal_firstname} {goal_surname}", goal_number, matchdate, serie, home_team, away_team, game_id)
-        DEBUG == 1 and print(f"Date: {matchdate}  Team: {normalized_team} Serie: {serie} Goal Scorer: #{goal_number} '{goal_firstname} {goal_surname}'")
-
-        # Assists (remaining matches)
-        for assist in matches[1:]:
-            assist_number, assist_surname, assist_firstname = assist
-            add_player_assist(player_stats, normalized_team, f"{assist_firstname} {assist_surname}", assist_number, matchdate, serie, home_team, away_team, game_id)
-            DEBUG == 1 and print(f"Date: {matchdate} Team: {normalized_team} Serie: {serie} Assist: #{assist_number} '{assist_firstname} {assist_surname}'")
-    else:
-        print(f"ERROR: Could not parse {input_string}")
-      
-def getAllScheduledGames(schedule_id):
+def plan_season(schedule_ids, concurrency=1, incremental=False):
+    """
+    Collect the games of all schedules into one work list before any game
+    is fetched. A game listed in several schedules (e.g. a group schedule
+    and the league-wide one) is planned once, with the date and group of
+    the first schedule listing it, so it is neither downloaded nor counted
+    twice. Games are otherwise left out as by pending_games.
+    """
+    planned = {}
+    listed = 0
+    contents = prefetch(fetch_page, [schedule_url(schedule_id) for schedule_id in schedule_ids], concurrency)
+    for schedule_id, content in zip(schedule_ids, contents):
+        if content is None:
+            log.warning("Failed to fetch schedule %s, its games are left out", schedule_id)
+            continue
+        games = schedule_games(schedule_id, content)
+        listed += len(games)
+        for game in games:
+            planned.setdefault(game[0], game)
+    if listed > len(planned):
+        log.info("%s games in %s schedules, %s duplicate listings skipped",
+                 len(planned), len(schedule_ids), listed - len(planned))
+    return pending_games(planned.values(), incremental)
+
+def schedule_url(schedule_id):
+    return f'https://stats.swehockey.se/ScheduleAndResults/Schedule/{schedule_id}'
+
+def schedule_games(schedule_id, content=None, unlinked=False):
     """
-    Get all games from a schedule ID and process lineups and game statistics
+    Return the games of a schedule that have a Game/Events link, as
+    (matchid, matchdate, game_text, group_text) in schedule order.
+    With unlinked, the games without a link (not started yet) are included
+    too, with None as matchid.
+    The schedule page is fetched unless its content is given.
     """
-    url = f'http://stats.swehockey.se/ScheduleAndResults/Schedule/{schedule_id}'
-    print(f'Collects scheduled games from {url}')
-    response = requests.get(url)
+    import pandas as pd
+    from bs4 import BeautifulSoup
+
+    url = schedule_url(schedule_id)
+    log.info('Collects scheduled games from %s', url)
+    if content is None:
+        content = fetch_page(url)
+    if content is None:
+        return []
+    parse_start = time.perf_counter()
 
     # Find group name from header
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(content, "html.parser")
     div = soup.select_one("div.d-lg-flex:nth-child(1)")
 
     if div:
         header_group = div.get_text(strip=True).split(",")[0]
-        print(f"Group from header: {header_group}")
+        log.info("Group from header: %s", header_group)
     else:
         header_group = None
-        print("No matching div found for group header")
+        log.warning("No matching div found for group header")
 
-    df_games = pd.read_html(response.text, extract_links="all", displayed_only=False)[2]
+    df_games = pd.read_html(io.BytesIO(content), extract_links="all", displayed_only=False)[2]
 
     # Flatten MultiIndex - handle nested tuples
     flattened_cols = []
@@ -408,80 +1682,249 @@ def getAllScheduledGames(schedule_id):
     col_venue = [c for c in df_games.columns if "Venue" in c][0]
     col_group = next((c for c in df_games.columns if "Group" in c), None)
 
-    # Build clean dataframe
-    clean = pd.DataFrame({
-        "date": df_games[col_date],
-        "game": df_games[col_game],
-        "result": df_games[col_result],
-        "venue": df_games[col_venue],
-        "group": df_games[col_group] if col_group else header_group
+    # With extract_links="all" every cell is a (text, href) tuple
+    date_text = df_games[col_date].str[0]
+    game_text = df_games[col_game].str[0]
+    result_href = df_games[col_result].str[1]
+    group_text = df_games[col_group].str[0] if col_group else pd.Series(header_group, index=df_games.index, dtype=object)
+
+    # SHL-style tables give the date once and only the time for the following games
+    # of that day, so time-only rows take the last full date above them. A time-only
+    # row without a full date above it keeps its text.
+    full_date = date_text.str.match(FULL_DATE_RE, na=False)
+    current_date = date_text.str.split().str[0].where(full_date).ffill()
+    time_only = date_text.str.match(TIME_ONLY_RE, na=False) & current_date.notna()
+    date_text = date_text.mask(time_only, current_date)
+
+    if log.isEnabledFor(logging.DEBUG):
+        for row in zip(date_text, game_text, df_games[col_result].str[0], df_games[col_venue].str[0], group_text):
+            log.debug("Date: %s Game: %s Result: %s Venue: %s Group: %s", *row)
+
+    # Only played games link to their Game/Events page
+    linked = result_href.notna()
+    matchid = result_href[linked].str.extract(GAME_LINK_RE, expand=False)
+    for href in result_href[linked][matchid.isna()]:
+        log.warning("Could not extract match ID from: %s", href)
+
+    games = pd.DataFrame({
+        "matchid": matchid,
+        "date": date_text.str.split().str[0],
+        "game": game_text,
+        "group": group_text,
     })
+    # A link without a match ID is left out either way
+    keep = games["matchid"].notna()
+    if unlinked:
+        keep |= ~linked
+    games = games[keep]
+    games = list(zip(games["matchid"].astype(object).where(games["matchid"].notna(), None),
+                     games["date"], games["game"], games["group"]))
+    metrics.observe("parse.schedule", time.perf_counter() - parse_start)
+    return games
+
+def process_games(games, label, concurrency=1, parse_workers=1):
+    """
+    Fetch, parse and merge games given as (matchid, matchdate, game_text, group_text).
+    See merge_games.
+    """
+    for _ in merge_games(games, label, concurrency, parse_workers):
+        pass
 
-    # Track current date for SHL-style tables where date appears once for multiple games
-    current_date = None
+def merge_games(games, label, concurrency=1, parse_workers=1):
+    """
+    Fetch, parse and merge games given as (matchid, matchdate, game_text, group_text),
+    yielding (matchid, event rows) after each game has been merged, with the
+    event_store rows of its goals, assists and penalties.
+    Pages are fetched (possibly in parallel) and parsed (possibly in worker
+    processes, see parse_games for the memoized parse results) ahead, and the
+    games are merged one at a time in the given order.
+    A game of which a page could not be fetched is not merged at all but
+    recorded in failed_games, so a later run can retry it.
+    """
+    # Games from earlier days are finished, so their pages can be cached for good.
+    today = date.today().isoformat()
+    pages = prefetch(fetch_game_pages, [(game[0], game[1] < today) for game in games], concurrency)
+    progress = Progress(label, len(games))
+    for (matchid, matchdate, game_text, group_text), results in zip(games, parse_games(pages, parse_workers)):
+        progress.update()
+        lineup_players = results.get("lineup")
+        if lineup_players is None or "goals" not in results:
+            log.warning("Failed to fetch %s for %s, it is left for a later run",
+                        "lineup" if lineup_players is None else "game events", matchid)
+            failed_games[matchid] = {"date": matchdate, "game": game_text, "group": group_text}
+            continue
+        failed_games.pop(matchid, None)
+
+        merge_start = time.perf_counter()
+        log.debug("Retrieving lineups for %s %s %s", matchid, matchdate, game_text)
+        (home_team, away_team) = getLineUps(matchid, matchdate, game_text, group_text, lineup_players)
+        log.debug("Retrieving game stats for %s %s  %s", matchid, matchdate, game_text)
+        first_event = len(event_store)
+        getGameStats(matchid, group_text, matchdate, game_text, results["goals"], results["penalties"])
+        event_rows = [event_store.row(i) for i in range(first_event, len(event_store))]
+        appearances = lineup_appearances(lineup_players)
+        if game_log is not None:
+            game_log.add_game(matchdate, group_text, matchid, appearances, event_rows)
+        metrics.observe("merge", time.perf_counter() - merge_start)
+        if stats_db is not None:
+            with metrics.timed("db.store"):
+                stats_db.store_game(matchid, matchdate, group_text, *game_teams(game_text), appearances, event_rows)
+        if event_spool is not None:
+            event_spool.add(event_store, player_stats)
+            event_store.clear()
+        processed_games.add(matchid)
+        yield matchid, event_rows
+
+def load_failed_games(filename):
+    """
+    Read the games a previous run could not fetch, as written by save_failed_games
+    """
+    if not os.path.exists(filename):
+        return
+    with open(filename, encoding='utf-8') as f:
+        for game in json.load(f):
+            failed_games[game["game_id"]] = {key: game[key] for key in ("date", "game", "group")}
 
-    for ind in clean.index:
-        # Extract game text and href
-        game_val = clean['game'][ind]
-        if isinstance(game_val, tuple):
-            game_text, game_href = game_val
-        else:
-            game_text = game_val
-            game_href = None
-        # Handle date - may be string or tuple
-        date_val = clean['date'][ind]
-        if isinstance(date_val, tuple):
-            date_text = date_val[0]
-        else:
-            date_text = date_val
-
-        # Check if date_text is a full date or just a time
-        # Full date format: "2025-09-13" or "2025-09-13 19:00"
-        # Time only format: "19:00" or "15:15"
-        if date_text and re.match(r'\d{4}-\d{2}-\d{2}', date_text):
-            # This is a full date, extract and save it
-            current_date = date_text.split()[0]
-        elif date_text and re.match(r'\d{2}:\d{2}', date_text) and current_date:
-            # This is just a time, use the last valid date
-            date_text = current_date
-
-        result_text, result_href = clean['result'][ind] if isinstance(clean['result'][ind], tuple) else (clean['result'][ind], None)
-        # Handle venue - may be string or tuple
-        venue_val = clean['venue'][ind]
-        if isinstance(venue_val, tuple):
-            venue_text, venue_href = venue_val
-        else:
-            venue_text = venue_val
-            venue_href = None
+def save_failed_games(filename):
+    """
+    Write the games that could not be fetched to filename (an empty list once all succeeded)
+    """
+    games = [{"game_id": matchid, **game} for matchid, game in failed_games.items()]
+    with open(filename, mode='w', encoding='utf-8') as f:
+        json.dump(games, f, ensure_ascii=False, indent=1)
+    if games:
+        log.warning("%s games could not be fetched, see %s (retry with --retry-failed)", len(games), filename)
 
-        # Handle group - may be string or tuple
-        group_val = clean['group'][ind]
-        if isinstance(group_val, tuple):
-            group_text, group_href = group_val
-        else:
-            group_text = group_val
-            group_href = None
-        DEBUG == 1 and print(f"Date: {date_text} Game: {game_text} Result: {result_text} Venue: {venue_text} Group: {group_text}")
-
-        # Skip if result_href is None
-        if result_href is None:
-            continue  # Skip this iteration if result_href is None
-
-        # Use a regular expression to extract the number
-        match = re.search(r"/Game/Events/(\d+)", result_href)
-        if match:
-            matchid = match.group(1)
-            #game_text, game_href = df_games['game'][ind]
-            ## Extract result text and href
-            #result_text, result_href = df_games['game'][ind]
-            #print(f"Lineup for {df_games['date'][ind][0]} {game_text}")
-            matchdate = date_text.split()[0]
-            print(f"Retrieving lineups for {matchid} {matchdate} {game_text}")
-            (home_team, away_team) = getLineUps(matchid, matchdate, game_text, group_text)
-            print(f"Retrieving game stats for {matchid} {matchdate}  {game_text}")
-            getGameStats(matchid, group_text, matchdate, game_text)
-        else:
-            print(f"Could not extract match ID from: {result_href}")
+class LiveGame:
+    """
+    Polling state of a game in progress: validators and hash of the last
+    Events page, the event rows applied so far and the score after them.
+    """
+    def __init__(self, matchid, matchdate, game_text, group_text):
+        self.matchid = matchid
+        self.matchdate = matchdate
+        self.game_text = game_text
+        self.group_text = group_text
+        self.home_team, self.away_team = game_teams(game_text)
+        self.lineup = None
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.rows = []
+        self.home_goals = 0
+        self.away_goals = 0
+        self.event_indices = []
+        # Rows of the players of the game in game_log
+        self.log_rows = {}
+
+def poll_live_game(game):
+    """
+    Bring a game in progress up to date. The lineup is counted once it can
+    be fetched. The Events page is requested conditionally, and an unchanged
+    page (304 or the same hash) is not parsed. Only event rows added since
+    the last poll are applied. Returns True if player_stats changed.
+    """
+    changed = False
+    if game.lineup is None:
+        content = crawler.get(lineups_url(game.matchid))
+        if content is not None:
+            game.lineup = parse_lineup(content)
+            getLineUps(game.matchid, game.matchdate, game.game_text, game.group_text, game.lineup)
+            if game_log is not None:
+                game_log.add_game(game.matchdate, game.group_text, game.matchid, lineup_appearances(game.lineup),
+                                  rows=game.log_rows)
+            changed = True
+
+    headers = {}
+    if game.etag:
+        headers["If-None-Match"] = game.etag
+    if game.last_modified:
+        headers["If-Modified-Since"] = game.last_modified
+    response = crawler.request(events_url(game.matchid), headers)
+    if response is None or response.status_code == 304:
+        return changed
+    response_headers = getattr(response, "headers", {})
+    game.etag = response_headers.get("ETag")
+    game.last_modified = response_headers.get("Last-Modified")
+    digest = hashlib.sha1(response.content).digest()
+    if digest == game.digest:
+        return changed
+    game.digest = digest
+
+    events = parse_game_events(response.content)
+    if events[:len(game.rows)] != game.rows:
+        log.warning("Earlier events of game %s changed on the page, only new events are counted", game.matchid)
+    new_events = events[len(game.rows):]
+    game.rows = events
+    if new_events:
+        log.info("Game %s %s: %s new events", game.matchid, game.game_text, len(new_events))
+        first_event = len(event_store)
+        game.home_goals, game.away_goals = apply_game_events(
+            game.matchid, game.group_text, game.matchdate, game.home_team, game.away_team,
+            parse_goals(new_events), parse_penalties(new_events), game.home_goals, game.away_goals
+        )
+        game.event_indices.extend(range(first_event, len(event_store)))
+        if game_log is not None:
+            game_log.add_game(game.matchdate, game.group_text, game.matchid,
+                              event_rows=[event_store.row(i) for i in range(first_event, len(event_store))],
+                              rows=game.log_rows)
+        changed = True
+
+    if changed and stats_db is not None:
+        stats_db.store_game(game.matchid, game.matchdate, game.group_text, game.home_team, game.away_team,
+                            lineup_appearances(game.lineup or []), [event_store.row(i) for i in game.event_indices])
+    return changed
+
+def poll_live_games(schedule_ids, interval=30, on_change=None, idle_timeout=1800, schedule_refresh=300):
+    """
+    Poll the games of today in the schedules until none has changed for
+    idle_timeout seconds (or Ctrl+C). Schedules are read again every
+    schedule_refresh seconds to find games that have started; while they
+    list games of today that have not started (no Events link yet) polling
+    goes on regardless of idle_timeout, and it stops at once if they list
+    no game of today that is either not started or linked and not processed.
+    After a round that changed player_stats, on_change() is called.
+    """
+    live_games = {}
+    last_change = time.monotonic()
+    next_refresh = 0
+    not_started = 0
+    try:
+        while not_started or time.monotonic() - last_change < idle_timeout:
+            if time.monotonic() >= next_refresh:
+                today = date.today().isoformat()
+                todays_games = not_started = 0
+                for schedule_id in schedule_ids:
+                    content = crawler.get(schedule_url(schedule_id))
+                    for matchid, matchdate, game_text, group_text in schedule_games(schedule_id, content, unlinked=True):
+                        if matchdate != today or matchid in processed_games:
+                            continue
+                        if matchid is None:
+                            not_started += 1
+                            continue
+                        todays_games += 1
+                        if matchid not in live_games:
+                            log.info("Following live game %s %s", matchid, game_text)
+                            live_games[matchid] = LiveGame(matchid, matchdate, game_text, group_text)
+                if not todays_games and not not_started:
+                    log.info("No games of today to follow, stopping")
+                    return
+                if not_started:
+                    log.info("%s games of today have not started yet", not_started)
+                    # Idle time counts from the start of the last game
+                    last_change = time.monotonic()
+                next_refresh = time.monotonic() + schedule_refresh
+
+            changed = [game for game in live_games.values() if poll_live_game(game)]
+            if changed:
+                last_change = time.monotonic()
+                if on_change is not None:
+                    on_change()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        log.info("Live polling stopped")
+        return
+    log.info("No changes in live games for %s seconds, stopping", idle_timeout)
 
 
 
@@ -508,60 +1951,363 @@ def write_player_stats_csv(stats, filename="player_stats.csv"):
                     data['pim']
                 ])
 
-    print(f"Player statistics written to {filename}")
+    log.info("Player statistics written to %s", filename)
 
-def write_events_csv(stats, filename="player_events.csv"):
+def write_events_csv(stats, filename="player_events.csv", events=None):
     """
-    Write all player events to CSV file
+    Write all player events (of events, default event_store) to CSV file
     Format: DATE;GROUP;TYPE;PLAYER NAME;PLAYER TEAM;HOME TEAM;AWAY TEAM;GAME ID;GAME LINK
     """
     with open(filename, mode='w', newline='', encoding='utf-8') as csvfile:
         csvwriter = csv.writer(csvfile, delimiter=';')
         # Write header
-        csvwriter.writerow(["DATE", "GROUP", "TYPE", "PLAYER NAME", "PLAYER TEAM", "HOME TEAM", "AWAY TEAM", "GAME ID", "GAME LINK"])
+        csvwriter.writerow(EVENTS_CSV_HEADER)
 
-        # Collect all events with player info
-        all_events = []
-        for team, players in stats.items():
-            for name, data in players.items():
-                for event in data['events']:
-                    game_id = event.get('game_id', '')
-                    game_link = f"https://stats.swehockey.se/Game/Events/{game_id}" if game_id else ""
-                    all_events.append({
-                        'date': event['date'],
-                        'series': event['series'],
-                        'type': event['type'].upper(),
-                        'home': event['home'],
-                        'away': event['away'],
-                        'player_name': name,
-                        'player_team': team,
-                        'minutes': event.get('minutes', ''),
-                        'game_id': game_id,
-                        'game_link': game_link
-                    })
-
-        # Sort by date
-        all_events.sort(key=lambda e: e['date'])
+        # Stream the events in date order straight from the event store
+        events = event_store if events is None else events
+        for i in events.date_order(stats):
+            csvwriter.writerow(event_csv_row(events.row(i)))
 
-        # Write data rows
-        for event in all_events:
-            event_type = event['type']
-            if event_type == 'PIM':
-                event_type = f"PIM {event['minutes']}"
-
-            csvwriter.writerow([
-                event['date'],
-                event['series'],
-                event_type,
-                event['player_name'],
-                event['player_team'],
-                event['home'],
-                event['away'],
-                event['game_id'],
-                event['game_link']
-            ])
-
-    print(f"Player events written to {filename}")
+    log.info("Player events written to %s", filename)
+
+EVENTS_CSV_HEADER = ["DATE", "GROUP", "TYPE", "PLAYER NAME", "PLAYER TEAM", "HOME TEAM", "AWAY TEAM", "GAME ID", "GAME LINK"]
+
+def event_csv_row(row):
+    """
+    The player_events.csv row of an EventStore row
+    """
+    event_type, minutes, team, name, matchdate, series, home, away, game_id = row
+    event_type = event_type.upper()
+    if event_type == 'PIM':
+        event_type = f"PIM {minutes}"
+    game_link = f"https://stats.swehockey.se/Game/Events/{game_id}" if game_id else ""
+
+    return [
+        matchdate,
+        series,
+        event_type,
+        name,
+        team,
+        home,
+        away,
+        game_id,
+        game_link
+    ]
+
+class EventSpool:
+    """
+    Streaming alternative to keeping every event in event_store. The events
+    of each game are moved here once the game is merged, and written as
+    sorted run files of at most run_size events, which write_csv k-way
+    merges into player_events.csv.
+    Each run row starts with a sort key of date, team rank, player rank (the
+    positions in player_stats, which only ever grows) and sequence number,
+    zero-padded and tab-separated so plain string order is the order of
+    EventStore.date_order. The output is the same file as write_events_csv
+    writes, while memory use is bounded by run_size.
+    """
+    MAX_MERGE = 64
+
+    def __init__(self, run_size=100000):
+        self.run_size = run_size
+        self.directory = tempfile.mkdtemp(prefix="swehockey-events-")
+        self.runs = []
+        self.buffer = []
+        self.seq = 0
+        self.team_ranks = {}
+        self.player_ranks = {}
+
+    def rank(self, stats, team, name):
+        team_rank = self.team_ranks.get(team)
+        if team_rank is None:
+            team_rank = self.team_ranks[team] = list(stats).index(team)
+        player_rank = self.player_ranks.get((team, name))
+        if player_rank is None:
+            player_rank = self.player_ranks[(team, name)] = list(stats[team]).index(name)
+        return team_rank, player_rank
+
+    def add(self, events, stats):
+        """
+        Append all events of an EventStore, in order
+        """
+        for i in range(len(events)):
+            row = events.row(i)
+            team_rank, player_rank = self.rank(stats, row[2], row[3])
+            self.buffer.append([f"{row[4]}\t{team_rank:08d}\t{player_rank:08d}\t{self.seq:012d}"] + event_csv_row(row))
+            self.seq += 1
+            if len(self.buffer) >= self.run_size:
+                self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        self.buffer.sort()
+        self.runs.append(self.write_run(self.buffer))
+        self.buffer = []
+
+    def write_run(self, rows):
+        filename = os.path.join(self.directory, f"run-{len(os.listdir(self.directory)):06d}.csv")
+        with open(filename, mode='w', newline='', encoding='utf-8') as f:
+            csv.writer(f, delimiter=';').writerows(rows)
+        return filename
+
+    def merge(self, runs):
+        """
+        Yield the rows of the sorted run files in runs in sorted order
+        """
+        files = [open(run, newline='', encoding='utf-8') for run in runs]
+        try:
+            yield from heapq.merge(*(csv.reader(f, delimiter=';') for f in files))
+        finally:
+            for f in files:
+                f.close()
+
+    def write_csv(self, filename="player_events.csv"):
+        self.flush()
+        # Merge the runs in rounds if there are too many to keep open at once
+        while len(self.runs) > self.MAX_MERGE:
+            self.runs = [self.write_run(self.merge(self.runs[:self.MAX_MERGE]))] + self.runs[self.MAX_MERGE:]
+
+        with open(filename, mode='w', newline='', encoding='utf-8') as csvfile:
+            csvwriter = csv.writer(csvfile, delimiter=';')
+            csvwriter.writerow(EVENTS_CSV_HEADER)
+            for row in self.merge(self.runs):
+                csvwriter.writerow(row[1:])
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+        log.info("Player events written to %s (merged from %s runs)", filename, len(self.runs))
+
+# Event spool used instead of keeping all events in event_store, set up in main with --stream-events
+event_spool = None
+
+# File extension and pyarrow.dataset format of the columnar output formats
+TABLE_FORMATS = {"parquet": ("parquet", "parquet"), "arrow": ("arrow", "ipc")}
+
+def dictionary_column(pa, codes, strings):
+    """
+    Build a dictionary-encoded string column from event store codes, with
+    only the strings that are used in the dictionary.
+    """
+    import numpy as np
+
+    used, indices = np.unique(codes, return_inverse=True)
+    return pa.DictionaryArray.from_arrays(indices.astype(np.int32), pa.array([strings[i] for i in used], pa.string()))
+
+def write_player_stats_table(stats, filename, fmt):
+    """
+    Write player statistics as a Parquet or Arrow IPC file with the columns
+    of player_stats.csv: team and name dictionary-encoded, counts as integers.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    rows = [(team, name, data) for team, players in stats.items() for name, data in players.items()]
+    numbers = pd.to_numeric(pd.Series([data['number'] for _, _, data in rows], dtype=object), errors='coerce')
+    table = pa.table({
+        "team": pa.array([team for team, _, _ in rows], pa.string()).dictionary_encode(),
+        "number": pa.array(numbers, pa.int16(), from_pandas=True),
+        "name": pa.array([name for _, name, _ in rows], pa.string()).dictionary_encode(),
+        "games_played": pa.array([data['games_played'] for _, _, data in rows], pa.int32()),
+        "goals": pa.array([data['goals'] for _, _, data in rows], pa.int32()),
+        "assists": pa.array([data['assists'] for _, _, data in rows], pa.int32()),
+        "pim": pa.array([data['pim'] for _, _, data in rows], pa.int32()),
+    })
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, filename)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, filename)
+
+    log.info("Player statistics written to %s", filename)
+
+def write_events_table(stats, directory, fmt, events=None):
+    """
+    Write all player events (of events, default event_store) as a Parquet or Arrow IPC dataset in directory,
+    partitioned by series (directory/series=<series>/...). Rows are in the
+    same order as player_events.csv. The CSV columns are typed: date as a
+    date (null for a time-only date), the PIM minutes in their own column
+    and string columns dictionary-encoded.
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    events = event_store if events is None else events
+    order = events.date_order(stats)
+    strings = events.strings
+
+    def codes(name):
+        return np.frombuffer(getattr(events, name), dtype=np.int32)[order]
+
+    dates = codes("date")
+    used_dates, date_indices = np.unique(dates, return_inverse=True)
+    # A time-only date (a game listed before any full date in its schedule) becomes null
+    date_values = pd.to_datetime([strings[i] for i in used_dates], format="%Y-%m-%d",
+                                 errors="coerce").values.astype("datetime64[D]")
+    types = np.frombuffer(events.type, dtype=np.int8)[order]
+    minutes = np.frombuffer(events.minutes, dtype=np.int16)[order]
+    game_ids = [strings[i] for i in codes("game_id")]
+
+    table = pa.table({
+        "date": pa.array(date_values[date_indices], pa.date32()),
+        "series": dictionary_column(pa, codes("series"), strings),
+        "type": pa.DictionaryArray.from_arrays(types.astype(np.int32), pa.array([t.upper() for t in EventStore.TYPES])),
+        "pim_minutes": pa.array(minutes, pa.int16(), mask=types != EventStore.TYPES.index("pim")),
+        "player_name": dictionary_column(pa, codes("player"), strings),
+        "player_team": dictionary_column(pa, codes("team"), strings),
+        "home_team": dictionary_column(pa, codes("home"), strings),
+        "away_team": dictionary_column(pa, codes("away"), strings),
+        "game_id": pa.array([int(game_id) if game_id else None for game_id in game_ids], pa.int64()),
+        "game_link": pa.array([f"https://stats.swehockey.se/Game/Events/{game_id}" if game_id else "" for game_id in game_ids],
+                              pa.string()).dictionary_encode(),
+    })
+
+    extension, dataset_format = TABLE_FORMATS[fmt]
+    # Rewrite the whole dataset, so partitions of series no longer present disappear
+    shutil.rmtree(directory, ignore_errors=True)
+    ds.write_dataset(table, directory, format=dataset_format, partitioning=["series"], partitioning_flavor="hive",
+                     basename_template=f"part-{{i}}.{extension}", preserve_order=True, use_threads=False)
+
+    log.info("Player events written to %s", directory)
+
+def output_tables():
+    """
+    Return the (stats, events) to output: everything in the stats database
+    if one is used, with totals computed by SQLite, otherwise this run's.
+    """
+    if stats_db is not None:
+        return stats_db.player_totals(), stats_db.load_events()
+    return player_stats, event_store
+
+def output_game_log():
+    """
+    Return the GameLog to output, of every game in the stats database if one is used
+    """
+    if stats_db is not None:
+        return stats_db.load_game_log()
+    return game_log
+
+def write_output_files(stats, events, fmt="csv", games=None):
+    """
+    Write the player stats and events files in fmt (csv, parquet or arrow),
+    and the --splits tables of the GameLog games if given
+    """
+    if fmt == "csv":
+        write_player_stats_csv(stats, "player_stats.csv")
+        write_events_csv(stats, "player_events.csv", events)
+    else:
+        write_player_stats_table(stats, f"player_stats.{TABLE_FORMATS[fmt][0]}", fmt)
+        write_events_table(stats, "player_events", fmt, events)
+    if games is not None:
+        write_player_views(stats, games, fmt)
+
+# Number of games played in the rolling form of player_views
+FORM_GAMES = 5
+
+def player_views(stats, games):
+    """
+    Per-player tables computed from the GameLog games with vectorized pandas
+    operations, players in the order of stats:
+    - player_games: one row per player and game, with points and the points
+      in the last FORM_GAMES games played up to that game (empty for a game
+      the player was not in the lineup of)
+    - player_series_stats: totals per player and series, with points per game
+    - player_form: totals with points per game, and the games and points of
+      the last FORM_GAMES games played
+    Returns {table name: DataFrame}.
+    """
+    import numpy as np
+    import pandas as pd
+
+    strings = np.array(games.strings + [""], dtype=object)
+    ranks = {}
+    for team_rank, (team, players) in enumerate(stats.items()):
+        for player_rank, (name, data) in enumerate(players.items()):
+            ranks[(team, name)] = (team_rank, player_rank, data["number"])
+
+    def column(name, dtype=np.int64):
+        return np.array(getattr(games, name), dtype=dtype)
+
+    df = pd.DataFrame({
+        "date": strings[column("date")],
+        "game_id": strings[column("game_id")],
+        "series": strings[column("series")],
+        "team": strings[column("team")],
+        "name": strings[column("player")],
+        "played": column("played"),
+        "goals": column("goals"),
+        "assists": column("assists"),
+        "pim": column("pim"),
+    })
+    # Players missing from stats (not expected) are put last
+    rank = [ranks.get(key, (len(stats), 0, "")) for key in zip(df["team"], df["name"])]
+    df.insert(4, "number", [number for _, _, number in rank])
+    df["team_rank"] = np.array([team_rank for team_rank, _, _ in rank], dtype=np.int64)
+    df["player_rank"] = np.array([player_rank for _, player_rank, _ in rank], dtype=np.int64)
+    df["seq"] = np.arange(len(df))
+    df["points"] = df["goals"] + df["assists"]
+    df = df.sort_values(["team_rank", "player_rank", "date", "seq"], kind="stable")
+    player_keys = ["team_rank", "player_rank"]
+
+    # Rolling form: running points over the games played, minus the running points FORM_GAMES games before
+    played = df[df["played"] > 0]
+    running = played.groupby(player_keys)["points"].cumsum()
+    df["last_5_points"] = (running - running.groupby([played["team_rank"], played["player_rank"]])
+                           .shift(FORM_GAMES, fill_value=0)).astype("Int64")
+    df["played_count"] = (df["played"] > 0).astype(np.int64)
+
+    def per_game(points, games_played):
+        return (points / games_played.where(games_played > 0)).round(2)
+
+    series = (df.groupby(player_keys + ["series"], sort=False)
+              .agg(team=("team", "first"), number=("number", "first"), name=("name", "first"),
+                   games_played=("played", "sum"), goals=("goals", "sum"), assists=("assists", "sum"),
+                   points=("points", "sum"), pim=("pim", "sum"))
+              .reset_index())
+    series["points_per_game"] = per_game(series["points"], series["games_played"])
+
+    form = (df.groupby(player_keys, sort=True)
+            .agg(team=("team", "first"), number=("number", "first"), name=("name", "first"),
+                 games_played=("played", "sum"), goals=("goals", "sum"), assists=("assists", "sum"),
+                 points=("points", "sum"), pim=("pim", "sum"), games_in_lineup=("played_count", "sum"))
+            .reset_index())
+    form["points_per_game"] = per_game(form["points"], form["games_played"])
+    last_form = played.assign(last_5_points=df["last_5_points"]).groupby(player_keys)["last_5_points"].last()
+    form = form.join(last_form.rename("last_5_points"), on=player_keys)
+    form["last_5_games"] = form["games_in_lineup"].clip(upper=FORM_GAMES)
+    form["last_5_points"] = form["last_5_points"].fillna(0).astype(np.int64)
+    form["last_5_points_per_game"] = per_game(form["last_5_points"], form["last_5_games"])
+
+    return {
+        "player_games": df[["date", "game_id", "series", "team", "number", "name", "played", "goals",
+                            "assists", "points", "pim", "last_5_points"]].reset_index(drop=True),
+        "player_series_stats": series[["team", "number", "name", "series", "games_played", "goals", "assists",
+                                       "points", "pim", "points_per_game"]],
+        "player_form": form[["team", "number", "name", "games_played", "goals", "assists", "points", "pim",
+                             "points_per_game", "last_5_games", "last_5_points", "last_5_points_per_game"]],
+    }
+
+def write_player_views(stats, games, fmt="csv"):
+    """
+    Write the tables of player_views as <table>.csv (with the upper case
+    headers and ; delimiter of the other CSV files), .parquet or .arrow
+    """
+    for table_name, table in player_views(stats, games).items():
+        if fmt == "csv":
+            filename = f"{table_name}.csv"
+            headers = [{"series": "GROUP"}.get(name, name.upper().replace("_", " ")) for name in table.columns]
+            table.to_csv(filename, sep=";", index=False, header=headers)
+        elif fmt == "parquet":
+            filename = f"{table_name}.parquet"
+            table.to_parquet(filename, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+            filename = f"{table_name}.arrow"
+            feather.write_feather(pa.Table.from_pandas(table, preserve_index=False), filename)
+        log.info("%s written to %s", table_name, filename)
 
 def print_stats(stats):
     print("\n=== PLAYER STATISTICS ===\n")
@@ -580,11 +2326,15 @@ def print_stats(stats):
 
         print()
 
-def print_all_stats(stats):
+def print_all_stats(stats, events=None):
     print("\n==============================")
     print("      FULL PLAYER STATS")
     print("==============================\n")
 
+    events = event_store if events is None else events
+    events_by_player = events.by_player()
+    strings = events.strings
+
     for team, players in stats.items():
         print(f"TEAM: {team}")
         print("=" * (6 + len(team)))
@@ -597,54 +2347,286 @@ def print_all_stats(stats):
             print(f"   PIM:          {data['pim']}")
             print("   Events:")
 
-            if not data["events"]:
+            rows = events_by_player.get((team, name))
+            if not rows:
                 print("      (no events recorded)")
                 continue
 
-            # Sort events by date if you want chronological order
-            events_sorted = sorted(data["events"], key=lambda e: e["date"])
+            # Sort events by date for chronological order
+            rows.sort(key=lambda i: strings[events.date[i]])
 
-            for e in events_sorted:
-                etype = e["type"].upper()
-                game_id = e.get('game_id', '')
+            for i in rows:
+                etype, minutes, _, _, matchdate, series, home, away, game_id = events.row(i)
                 game_link = f"https://stats.swehockey.se/Game/Events/{game_id}" if game_id else ""
 
-                if etype == "GOAL":
-                    print(f"      {e['date']}  GOAL     vs {e['home']} / {e['away']}  ({e['series']})  [{game_link}]")
+                if etype == "goal":
+                    print(f"      {matchdate}  GOAL     vs {home} / {away}  ({series})  [{game_link}]")
 
-                elif etype == "ASSIST":
-                    print(f"      {e['date']}  ASSIST   vs {e['home']} / {e['away']}  ({e['series']})  [{game_link}]")
+                elif etype == "assist":
+                    print(f"      {matchdate}  ASSIST   vs {home} / {away}  ({series})  [{game_link}]")
 
-                elif etype == "PIM":
-                    print(f"      {e['date']}  PIM {e['minutes']:>2}  vs {e['home']} / {e['away']}  ({e['series']})  [{game_link}]")
-
-                elif etype == "PLAYED":
-                    print(f"      {e['date']}  PLAYED   vs {e['home']} / {e['away']}  ({e['series']})  [{game_link}]")
+                elif etype == "pim":
+                    print(f"      {matchdate}  PIM {minutes:>2}  vs {home} / {away}  ({series})  [{game_link}]")
 
         print("\n")
 
+# Module globals a Scraper puts its own state in while it runs
+SCRAPER_STATE = ("player_stats", "team_name_mapping", "canonical_teams", "processed_games", "failed_games",
+                 "event_store", "game_log", "team_index", "player_registry", "session", "crawler", "page_cache",
+                 "stats_db", "event_spool", "parse_pool", "metrics")
+# Held by the Scraper that is running, from the start of a run until it has finished
+scraper_lock = threading.Lock()
+# Thread the running Scraper runs in
+scraper_thread = None
+
+class Scraper:
+    """
+    Library interface for using the scraper from other programs. A Scraper
+    owns the state a run of this script keeps in module globals (stats,
+    team name mappings, processed games, events, the page cache and the
+    HTTP crawler), so a long-running process can import the module once
+    and use one or more Scrapers repeatedly:
+
+        scraper = Scraper(cache=".swehockey_cache.sqlite")
+        for event in scraper.iter_game_events(["19563", "19565"]):
+            print(event.date, event.type, event.player, event.team)
+        print(scraper.player_stats)
+        scraper.close()
+
+    A Scraper skips games it has processed before. The scraping functions
+    work on the module globals, so a Scraper puts its state there while it
+    runs, including while a generator of iter_game_events is suspended
+    (pages are fetched ahead in the background). One Scraper runs at a time:
+    other threads wait for it, and starting a run in the thread of an
+    unfinished iter_game_events generator raises RuntimeError instead of
+    mixing the state of the two Scrapers. A generator must be consumed (or
+    closed) in the thread that started it.
+    """
+    def __init__(self, cache=None, rate=10.0, concurrency=1, timeout=30, cache_ttl=3600, offline=False, refresh=False):
+        self.concurrency = concurrency
+        self.player_stats = {}
+        self.team_name_mapping = {}
+        self.canonical_teams = {}
+        self.processed_games = set()
+        self.failed_games = {}
+        self.event_store = EventStore()
+        self.game_log = None
+        self.team_index = TeamNameIndex()
+        self.player_registry = PlayerRegistry()
+        self.session = create_session(max(concurrency, 1))
+        self.crawler = Crawler(rate=rate, max_concurrency=concurrency, timeout=(5, timeout))
+        self.page_cache = PageCache(cache, ttl=cache_ttl, offline=offline, refresh=refresh) if cache else None
+        self.stats_db = None
+        self.event_spool = None
+        self.parse_pool = None
+        self.metrics = Metrics()
+
+    @contextlib.contextmanager
+    def _running(self):
+        global scraper_thread
+        # Waiting for the lock held by this thread would never end
+        if scraper_thread == threading.get_ident():
+            raise RuntimeError("A Scraper is already running in this thread, finish or close its "
+                               "iter_game_events generator first")
+        with scraper_lock:
+            scraper_thread = threading.get_ident()
+            module_state = {name: globals()[name] for name in SCRAPER_STATE}
+            globals().update({name: getattr(self, name) for name in SCRAPER_STATE})
+            try:
+                yield
+            finally:
+                for name in SCRAPER_STATE:
+                    setattr(self, name, globals()[name])
+                globals().update(module_state)
+                scraper_thread = None
+
+    def iter_game_events(self, schedule_ids, incremental=False):
+        """
+        Process the games of schedule_ids (see plan_season) and yield the
+        PlayerEvent records of each game as soon as it has been merged, so
+        they can be used before the whole schedule has been processed
+        """
+        with self._running():
+            games = plan_season(schedule_ids, self.concurrency, incremental)
+            for _, event_rows in merge_games(games, "Season", self.concurrency):
+                for row in event_rows:
+                    yield PlayerEvent(*row)
+
+    def scrape(self, schedule_ids, incremental=False):
+        """Process the games of schedule_ids and return player_stats"""
+        for _ in self.iter_game_events(schedule_ids, incremental):
+            pass
+        return self.player_stats
+
+    def close(self):
+        if self.page_cache is not None:
+            self.page_cache.close()
+
+def iter_game_events(schedule_ids, **options):
+    """
+    Yield the PlayerEvent records of the games of schedule_ids as they are
+    processed, with a new Scraper(**options)
+    """
+    scraper = Scraper(**options)
+    try:
+        yield from scraper.iter_game_events(schedule_ids)
+    finally:
+        scraper.close()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect player statistics from stats.swehockey.se schedules")
+    parser.add_argument("schedule_ids", nargs="*", help="Schedule IDs to process")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="Number of games to download in parallel (default: 1)")
+    parser.add_argument("--rate", type=float, default=10, metavar="REQUESTS",
+                        help="Maximum requests per second to stats.swehockey.se (default: 10, 0 for no limit)")
+    parser.add_argument("--timeout", type=float, default=30, metavar="SECONDS",
+                        help="Read timeout of each request (default: 30)")
+    parser.add_argument("--failed-games", default="failed_games.json", metavar="FILE",
+                        help="Where games whose pages could not be fetched are listed (default: failed_games.json)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Only process the games listed in the --failed-games file, adding them to the games of --state or --db")
+    parser.add_argument("--live", action="store_true",
+                        help="After processing the finished games, follow today's games and update the output files as events happen")
+    parser.add_argument("--poll-interval", type=float, default=30, metavar="SECONDS",
+                        help="How often --live checks the games for new events (default: 30)")
+    parser.add_argument("--parse-workers", type=int, default=1, metavar="N",
+                        help="Number of processes parsing downloaded pages (default: 1, parse in this process)")
+    parser.add_argument("--cache", default=".swehockey_cache.sqlite", metavar="FILE",
+                        help="Page cache file (default: .swehockey_cache.sqlite)")
+    parser.add_argument("--cache-ttl", type=int, default=3600, metavar="SECONDS",
+                        help="How long schedules and unfinished games stay cached (default: 3600)")
+    parser.add_argument("--offline", action="store_true", help="Only use cached pages, never access the network")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached pages and download everything again")
+    parser.add_argument("--state", metavar="FILE",
+                        help="Keep stats between runs in FILE and only process games not seen before")
+    parser.add_argument("--db", metavar="FILE",
+                        help="Store games, lineups and events in the SQLite database FILE and write the totals of all games in it")
+    parser.add_argument("--stream-events", action="store_true",
+                        help="Write events to sorted temporary files as games are processed and merge them into "
+                             "player_events.csv at the end, instead of keeping all events in memory")
+    parser.add_argument("--splits", action="store_true",
+                        help="Also write per-game, per-series and last 5 games tables (player_games, "
+                             "player_series_stats, player_form)")
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "arrow"],
+                        help="Output format of player stats and events (default: csv, parquet/arrow need pyarrow)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="Minimum level of log messages (default: INFO, DEBUG traces every parsed row)")
+    parser.add_argument("--log-file", metavar="FILE", help="Also write log messages to FILE")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Add the timings and counters of this run to the JSON file FILE, which keeps the last 100 runs")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Profile the run with cProfile and write the stats to FILE (pstats format)")
+    args = parser.parse_args()
+
+    if args.format != "csv" and importlib.util.find_spec("pyarrow") is None:
+        parser.error(f"--format {args.format} needs pyarrow (pip install pyarrow)")
+
+    if args.stream_events and (args.state or args.db or args.format != "csv" or args.live):
+        parser.error("--stream-events cannot be combined with --state, --db, --format or --live")
+
+    # The output of a retry only covers the retried games unless earlier games come from the state or database
+    if args.retry_failed and args.schedule_ids:
+        parser.error("--retry-failed only processes the games in the --failed-games file, not schedule IDs")
+    if args.retry_failed and args.live:
+        parser.error("--live cannot be combined with --retry-failed")
+    if args.retry_failed and not (args.state or args.db):
+        parser.error("--retry-failed needs --state or --db, otherwise the output only has the retried games")
+
+    setup_logging(args.log_level, args.log_file)
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if args.parse_workers > 1:
+        parse_pool = create_parse_pool(args.parse_workers)
+
+    session = create_session(max(args.concurrency, 1))
+    crawler = Crawler(rate=args.rate, max_concurrency=args.concurrency, timeout=(5, args.timeout))
+    page_cache = PageCache(args.cache, ttl=args.cache_ttl, offline=args.offline, refresh=args.refresh)
+    # With --db the --splits tables are computed from the database, the state file keeps the log for later runs
+    if args.state or (args.splits and not args.db):
+        game_log = GameLog()
+    if args.state:
+        load_state(args.state)
+    if args.db:
+        stats_db = StatsDB(args.db)
+    if args.stream_events:
+        event_spool = EventSpool()
+
+    if args.retry_failed:
+        load_failed_games(args.failed_games)
+        schedule_ids = []
+        retry_games = [game_id for game_id in failed_games if game_id not in processed_games]
+        process_games([(game_id, failed_games[game_id]["date"], failed_games[game_id]["game"], failed_games[game_id]["group"])
+                       for game_id in retry_games], "Failed games", args.concurrency, args.parse_workers)
     # Check if schedule IDs are provided as command-line arguments
-    if len(sys.argv) > 1:
+    elif args.schedule_ids:
         # Use schedule IDs from command-line arguments
-        schedule_ids = sys.argv[1:]
+        schedule_ids = args.schedule_ids
     else:
         # Default schedule IDs if none provided
-        print("No schedule IDs provided. Usage: python3 get_all_stats.py <schedule_id1> [schedule_id2] ...")
-        print("Using default schedule ID: 19563")
+        log.warning("No schedule IDs provided. Usage: python3 get_all_stats.py <schedule_id1> [schedule_id2] ...")
+        log.info("Using default schedule ID: 19563")
         schedule_ids = ['19563']
 
-    # Process each schedule ID
-    for schedule_id in schedule_ids:
-        print(f"\n{'='*60}")
-        print(f"Processing schedule ID: {schedule_id}")
-        print(f"{'='*60}\n")
-        getAllScheduledGames(schedule_id)
-
-    # Print stats to console
-    print_all_stats(player_stats)
-
-    # Write CSV files
-    write_player_stats_csv(player_stats, "player_stats.csv")
-    write_events_csv(player_stats, "player_events.csv")
+    # Plan the games of all schedules first, so games listed in several of them are processed once
+    if schedule_ids:
+        log.info("Processing schedule IDs: %s", ", ".join(schedule_ids))
+        season_games = plan_season(schedule_ids, args.concurrency, incremental=bool(args.state) or args.live)
+        process_games(season_games, "Season", args.concurrency, args.parse_workers)
+
+    if parse_pool is not None:
+        parse_pool.shutdown()
+    if failed_games or os.path.exists(args.failed_games):
+        save_failed_games(args.failed_games)
+    if crawler.requests:
+        log.info("%s requests, %s retries, %s pages failed", crawler.requests, crawler.retries, crawler.failures)
+    # Saved before live polling, games in progress are processed again by the next run
+    if args.state:
+        save_state(args.state)
+
+    if args.live:
+        def write_live_output():
+            write_output_files(*output_tables(), args.format, output_game_log() if args.splits else None)
+
+        write_live_output()
+        poll_live_games(schedule_ids, args.poll_interval, write_live_output)
+
+    # With a database the output covers every game stored in it
+    output_stats, output_events = output_tables()
+    output_games = output_game_log() if args.splits else None
+    if stats_db is not None:
+        stats_db.close()
+
+    # Print stats to console, the events of a streaming run are only in the CSV file
+    if event_spool is not None:
+        print_stats(output_stats)
+    else:
+        print_all_stats(output_stats, output_events)
+
+    # Write output files
+    with metrics.timed("write"):
+        if event_spool is not None:
+            write_player_stats_csv(output_stats, "player_stats.csv")
+            event_spool.write_csv("player_events.csv")
+            if output_games is not None:
+                write_player_views(output_stats, output_games)
+        else:
+            write_output_files(output_stats, output_events, args.format, output_games)
+
+    page_cache.close()
+
+    if args.profile:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        log.info("Profile written to %s", args.profile)
+    if args.metrics:
+        metrics.write(args.metrics, {
+            "schedule_ids": schedule_ids,
+            "games": len(processed_games),
+            "requests": crawler.requests,
+            "retries": crawler.retries,
+            "failed_pages": crawler.failures,
+        })
 
@@ -0,0 +1,371 @@
+"""
+Read-only HTTP/JSON server over the CSV files written by get_all_stats.py.
+
+player_stats.csv and player_events.csv are loaded into memory with indexes
+by team, series, player and date, so leaderboards and event histories are
+answered without touching the files. When a scrape rewrites the files they
+are loaded again in a background thread and swapped in once complete;
+requests that are already running finish on the data they started with.
+
+Usage:
+    python3 stats_server.py                             # files in the current directory, port 8000
+    python3 stats_server.py --dir output --port 8080
+
+Endpoints (GET, JSON; team, series and player names match regardless of case and accents):
+    /leaders?stat=points&series=<series>&team=<team>&limit=10
+    /players?name=<part of name>&team=<team>
+    /player?name=<name>&team=<team>
+    /events?team=&series=&player=&type=goal|assist|pim&from=YYYY-MM-DD&to=YYYY-MM-DD&limit=100
+    /teams
+    /series
+    /status
+"""
+import argparse
+import bisect
+import csv
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from get_all_stats import EVENTS_CSV_HEADER, player_name_key, setup_logging
+
+log = logging.getLogger("swehockey.server")
+
+STATS_FILE = "player_stats.csv"
+EVENTS_FILE = "player_events.csv"
+LEADER_STATS = ("points", "goals", "assists", "pim", "games_played")
+EVENT_TYPES = ("goal", "assist", "pim")
+
+
+class QueryError(Exception):
+    """A request that cannot be answered, with the HTTP status to answer it with"""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def files_signature(directory):
+    """(name, mtime, size) of the CSV files in directory, None for a missing file"""
+    signature = []
+    for name in (STATS_FILE, EVENTS_FILE):
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def read_csv(filename, header):
+    with open(filename, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter=';')
+        if next(reader, None) != header:
+            raise ValueError(f"{filename} does not start with the header {';'.join(header)}")
+        yield from reader
+
+
+class Snapshot:
+    """
+    The stats and events of one version of the CSV files with their indexes.
+    Never changed once built, so any number of request threads can read it
+    while the next one is loaded.
+    """
+    def __init__(self, directory):
+        self.signature = files_signature(directory)
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.players = []
+        self.player_index = {}
+        self.by_team = {}
+        self.by_name = {}
+        self.teams = {}
+        self.series = {}
+
+        stats_header = ["TEAM", "NUMBER", "NAME", "GAMES PLAYED", "GOALS", "ASSISTS", "PIM"]
+        for team, number, name, games_played, goals, assists, pim in read_csv(os.path.join(directory, STATS_FILE), stats_header):
+            self.add_player(team, number, name, int(games_played), int(goals), int(assists), int(pim))
+
+        # Events in date order, with the dates in a parallel list for range lookups
+        self.events = []
+        self.event_dates = []
+        self.events_by_player = {}
+        self.events_by_team = {}
+        self.events_by_series = {}
+        self.series_totals = {}
+        rows = sorted(read_csv(os.path.join(directory, EVENTS_FILE), EVENTS_CSV_HEADER), key=lambda row: row[0])
+        for matchdate, series, event_type, player_name, team, home, away, game_id, game_link in rows:
+            self.add_event(matchdate, series, event_type, player_name, team, home, away, game_id, game_link)
+
+    def add_player(self, team, number, name, games_played, goals, assists, pim):
+        player = {
+            "team": team, "number": number, "name": name, "games_played": games_played,
+            "goals": goals, "assists": assists, "points": goals + assists, "pim": pim
+        }
+        self.players.append(player)
+        self.player_index[(team, name)] = player
+        self.by_team.setdefault(team, []).append(player)
+        self.by_name.setdefault(player_name_key(name), []).append(player)
+        self.teams.setdefault(player_name_key(team), team)
+
+    def add_event(self, matchdate, series, event_type, player_name, team, home, away, game_id, game_link):
+        # PIM rows are typed "PIM <minutes>"
+        event_type, _, minutes = event_type.partition(" ")
+        event = {
+            "date": matchdate, "series": series, "type": event_type.lower(),
+            "minutes": int(minutes) if minutes else None, "player": player_name, "team": team,
+            "home_team": home, "away_team": away, "game_id": game_id, "game_link": game_link
+        }
+        index = len(self.events)
+        self.events.append(event)
+        self.event_dates.append(matchdate)
+        self.events_by_player.setdefault((team, player_name), []).append(index)
+        self.events_by_team.setdefault(team, []).append(index)
+        self.events_by_series.setdefault(series, []).append(index)
+        self.series.setdefault(player_name_key(series), series)
+
+        player = self.player_index.get((team, player_name))
+        totals = self.series_totals.setdefault(series, {}).get((team, player_name))
+        if totals is None:
+            totals = self.series_totals[series][(team, player_name)] = {
+                "team": team, "number": player["number"] if player else "", "name": player_name,
+                "series": series, "goals": 0, "assists": 0, "points": 0, "pim": 0
+            }
+        if event["type"] == "pim":
+            totals["pim"] += event["minutes"] or 0
+        else:
+            totals[event["type"] + "s"] += 1
+            totals["points"] += 1
+
+    def team(self, params):
+        """The team named by the team parameter, None if not given"""
+        if not params.get("team"):
+            return None
+        team = self.teams.get(player_name_key(params["team"]))
+        if team is None:
+            raise QueryError(f"Unknown team '{params['team']}'", 404)
+        return team
+
+    def series_name(self, params):
+        if not params.get("series"):
+            return None
+        series = self.series.get(player_name_key(params["series"]))
+        if series is None:
+            raise QueryError(f"Unknown series '{params['series']}'", 404)
+        return series
+
+    def find_player(self, params):
+        """The player named by the name (and team) parameters"""
+        if not params.get("name"):
+            raise QueryError("The name parameter is required")
+        team = self.team(params)
+        players = [player for player in self.by_name.get(player_name_key(params["name"]), [])
+                   if team is None or player["team"] == team]
+        if not players:
+            raise QueryError(f"Unknown player '{params['name']}'", 404)
+        if len(players) > 1:
+            raise QueryError(f"'{params['name']}' plays in {', '.join(player['team'] for player in players)}, "
+                             f"give the team parameter")
+        return players[0]
+
+    def leaders(self, params):
+        stat = params.get("stat", "points")
+        if stat not in LEADER_STATS:
+            raise QueryError(f"stat must be one of {', '.join(LEADER_STATS)}")
+        limit = int_param(params, "limit", 10)
+        team = self.team(params)
+        series = self.series_name(params)
+        if series is not None:
+            if stat == "games_played":
+                raise QueryError("games_played is not counted per series")
+            candidates = self.series_totals[series].values()
+        elif team is not None:
+            candidates = self.by_team[team]
+        else:
+            candidates = self.players
+        if team is not None and series is not None:
+            candidates = [player for player in candidates if player["team"] == team]
+        # nlargest keeps the file order for ties
+        return {"stat": stat, "team": team, "series": series,
+                "players": heapq.nlargest(limit, candidates, key=lambda player: player[stat])}
+
+    def search_players(self, params):
+        key = player_name_key(params.get("name", ""))
+        team = self.team(params)
+        players = self.by_team[team] if team is not None else self.players
+        return {"players": [player for player in players if key in player_name_key(player["name"])]}
+
+    def player(self, params):
+        player = self.find_player(params)
+        key = (player["team"], player["name"])
+        return {
+            **player,
+            "series": [totals[key] for totals in self.series_totals.values() if key in totals],
+            "events": [self.events[index] for index in self.events_by_player.get(key, [])]
+        }
+
+    def query_events(self, params):
+        limit = int_param(params, "limit", 100)
+        first = bisect.bisect_left(self.event_dates, params["from"]) if params.get("from") else 0
+        last = bisect.bisect_right(self.event_dates, params["to"]) if params.get("to") else len(self.events)
+
+        # Start from the smallest index that applies, then filter on the rest
+        candidates = [range(first, last)]
+        filters = []
+        if params.get("player"):
+            player = self.find_player({"name": params["player"], "team": params.get("team")})
+            candidates.append(self.events_by_player.get((player["team"], player["name"]), []))
+        team = self.team(params)
+        if team is not None:
+            candidates.append(self.events_by_team.get(team, []))
+            filters.append(lambda event: event["team"] == team)
+        series = self.series_name(params)
+        if series is not None:
+            candidates.append(self.events_by_series[series])
+            filters.append(lambda event: event["series"] == series)
+        event_type = params.get("type", "").lower()
+        if event_type:
+            if event_type not in EVENT_TYPES:
+                raise QueryError(f"type must be one of {', '.join(EVENT_TYPES)}")
+            filters.append(lambda event: event["type"] == event_type)
+
+        indices = min(candidates, key=len)
+        events = [self.events[index] for index in indices
+                  if first <= index < last and all(matches(self.events[index]) for matches in filters)]
+        return {"count": len(events), "events": events[:limit]}
+
+    def list_teams(self, params):
+        return {"teams": [{"team": team, "players": len(players)} for team, players in self.by_team.items()]}
+
+    def list_series(self, params):
+        return {"series": [{"series": series, "events": len(self.events_by_series[series])}
+                           for series in sorted(self.events_by_series)]}
+
+    def status(self, params):
+        return {"loaded_at": self.loaded_at, "players": len(self.players), "events": len(self.events),
+                "teams": len(self.by_team), "series": len(self.events_by_series)}
+
+
+def int_param(params, name, default):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise QueryError(f"{name} must be a number") from None
+    if value < 1:
+        raise QueryError(f"{name} must be at least 1")
+    return value
+
+
+ROUTES = {
+    "/leaders": Snapshot.leaders,
+    "/players": Snapshot.search_players,
+    "/player": Snapshot.player,
+    "/events": Snapshot.query_events,
+    "/teams": Snapshot.list_teams,
+    "/series": Snapshot.list_series,
+    "/status": Snapshot.status,
+}
+
+
+class StatsRequestHandler(BaseHTTPRequestHandler):
+    server_version = "swehockey-stats"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        # The snapshot of this request, a reload only replaces the server's reference
+        snapshot = self.server.snapshot
+        route = ROUTES.get(url.path.rstrip("/") or "/")
+        if route is None:
+            self.send_json(404, {"error": f"Unknown path {url.path}", "paths": sorted(ROUTES)})
+            return
+        try:
+            self.send_json(200, route(snapshot, params))
+        except QueryError as e:
+            self.send_json(e.status, {"error": str(e)})
+
+    def send_json(self, status, body):
+        content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        log.debug("%s %s", self.address_string(), format % args)
+
+
+class StatsServer(ThreadingHTTPServer):
+    """
+    Serves the Snapshot of the CSV files in directory, and replaces it with a
+    new one when the files have changed and then stayed unchanged for one
+    reload interval (so files still being written by a scrape are not read).
+    """
+    daemon_threads = True
+
+    def __init__(self, address, directory, reload_interval=2.0):
+        self.directory = directory
+        self.reload_interval = reload_interval
+        self.snapshot = Snapshot(directory)
+        log.info("Loaded %s players and %s events from %s", len(self.snapshot.players), len(self.snapshot.events), directory)
+        super().__init__(address, StatsRequestHandler)
+        self.watcher = threading.Thread(target=self.watch, name="reload", daemon=True)
+
+    def watch(self):
+        previous = self.snapshot.signature
+        failed = None
+        while True:
+            time.sleep(self.reload_interval)
+            signature = files_signature(self.directory)
+            if signature != previous or signature in (self.snapshot.signature, failed) or None in signature:
+                previous = signature
+                continue
+            try:
+                snapshot = Snapshot(self.directory)
+            except (OSError, ValueError, csv.Error, KeyError) as e:
+                log.warning("Keeping the loaded stats, could not load %s: %s", self.directory, e)
+                failed = signature
+                continue
+            self.snapshot = snapshot
+            log.info("Reloaded %s players and %s events", len(snapshot.players), len(snapshot.events))
+
+    def serve_forever(self, poll_interval=0.5):
+        self.watcher.start()
+        super().serve_forever(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the stats written by get_all_stats.py as JSON")
+    parser.add_argument("--dir", default=".", help="Directory with player_stats.csv and player_events.csv (default: .)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--reload-interval", type=float, default=2.0, metavar="SECONDS",
+                        help="How often to check the CSV files for a new scrape (default: 2)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="DEBUG also logs every request (default: INFO)")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level)
+    try:
+        server = StatsServer((args.host, args.port), args.dir, args.reload_interval)
+    except (OSError, ValueError, csv.Error) as e:
+        log.error("Could not start: %s", e)
+        return 1
+    log.info("Serving on http://%s:%s/", args.host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())